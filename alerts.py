@@ -0,0 +1,205 @@
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+DEFAULT_ALERT_RULES = {
+    'low_stock_days': 7,
+    'expiry_window_days': 30,
+    'expiry_urgent_days': 7,
+    'critical_min_criticality': 4,
+    'critical_stock_days': 14
+}
+
+SEVERITY_LEVELS = np.array(['critical', 'high', 'medium', 'low'], dtype=object)
+SEVERITY_RANK = {name: rank for rank, name in enumerate(SEVERITY_LEVELS)}
+
+ALERT_COLUMNS = [
+    'type', 'product_id', 'product_name', 'severity', 'severity_rank',
+    'days_remaining', 'stock_level', 'avg_demand'
+]
+
+
+def format_alert(alert):
+    if alert['type'] == 'low_stock':
+        return (
+            f"Low stock alert: {alert['product_name']} (ID: {alert['product_id']}) - "
+            f"Current stock: {int(alert['stock_level'])} "
+            f"({alert['avg_demand']:.1f}/day, {alert['days_remaining']:.1f} days remaining)"
+        )
+    if alert['type'] == 'expiry':
+        return (
+            f"Expiry alert: Product {alert['product_id']} - "
+            f"Expires in {int(alert['days_remaining'])} days"
+        )
+    return (
+        f"Critical item alert: Product {alert['product_id']} - "
+        f"High criticality item running low"
+    )
+
+
+def alert_record(alert):
+    record = dict(alert)
+    record['product_id'] = int(record['product_id'])
+    record['severity_rank'] = int(record['severity_rank'])
+    record['days_remaining'] = float(record['days_remaining'])
+    record['stock_level'] = float(record['stock_level'])
+    record['avg_demand'] = float(record['avg_demand'])
+    record['message'] = format_alert(record)
+    return record
+
+
+class AlertEngine:
+    def __init__(self, rules=None):
+        self.rules = {**DEFAULT_ALERT_RULES, **(rules or {})}
+
+    def evaluate(self, snapshot, avg_demand, now=None):
+        # snapshot holds one latest row per product; avg_demand is aligned with it.
+        rules = self.rules
+        now = np.datetime64(now or datetime.now(), 's')
+
+        product_ids = snapshot['product_id'].to_numpy()
+        product_names = snapshot['product_name'].to_numpy(dtype=object)
+        stock = snapshot['stock_level'].to_numpy(dtype=np.float64)
+        avg_demand = np.asarray(avg_demand, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stock_days = np.where(avg_demand > 0, stock / avg_demand, np.inf)
+
+        expiry = snapshot['expiry_date'].to_numpy().astype('datetime64[s]')
+        days_to_expiry = np.floor((expiry - now) / np.timedelta64(1, 'D'))
+        criticality = snapshot['criticality'].to_numpy()
+
+        low_stock = stock_days < rules['low_stock_days']
+        expiring = (expiry < now + np.timedelta64(rules['expiry_window_days'], 'D')) & (days_to_expiry > 0)
+        critical = (criticality >= rules['critical_min_criticality']) & (stock_days < rules['critical_stock_days'])
+
+        frames = [
+            self.build_frame('low_stock', low_stock, stock_days,
+                             np.where(stock_days < rules['low_stock_days'] / 2, SEVERITY_RANK['high'], SEVERITY_RANK['medium']),
+                             product_ids, product_names, stock, avg_demand),
+            self.build_frame('expiry', expiring, days_to_expiry,
+                             np.where(days_to_expiry <= rules['expiry_urgent_days'], SEVERITY_RANK['high'], SEVERITY_RANK['low']),
+                             product_ids, product_names, stock, avg_demand),
+            self.build_frame('critical_item', critical, stock_days,
+                             np.full(len(product_ids), SEVERITY_RANK['critical']),
+                             product_ids, product_names, stock, avg_demand)
+        ]
+        alerts = pd.concat(frames, ignore_index=True)
+        return alerts.sort_values(['severity_rank', 'days_remaining'], kind='mergesort', ignore_index=True)
+
+    def build_frame(self, alert_type, mask, days_remaining, severity_rank, product_ids, product_names, stock, avg_demand):
+        severity_rank = severity_rank[mask].astype(np.int8)
+        return pd.DataFrame({
+            'type': alert_type,
+            'product_id': product_ids[mask],
+            'product_name': product_names[mask],
+            'severity': SEVERITY_LEVELS[severity_rank],
+            'severity_rank': severity_rank,
+            'days_remaining': days_remaining[mask],
+            'stock_level': stock[mask],
+            'avg_demand': avg_demand[mask]
+        }, columns=ALERT_COLUMNS)
+
+    def page(self, alerts, page=1, page_size=50, alert_type=None, min_severity=None, sort_by=None):
+        if alert_type is not None:
+            alerts = alerts[alerts['type'] == alert_type]
+        if min_severity is not None:
+            alerts = alerts[alerts['severity_rank'] <= SEVERITY_RANK[min_severity]]
+        if sort_by is not None:
+            alerts = alerts.sort_values(sort_by, kind='mergesort')
+
+        start = (page - 1) * page_size
+        records = [alert_record(alert) for alert in alerts.iloc[start:start + page_size].to_dict('records')]
+        return {
+            'total': len(alerts),
+            'page': page,
+            'page_size': page_size,
+            'alerts': records
+        }
+
+
+class AlertMonitor:
+    # Keeps the active alert set per product so that an update for a few
+    # products only re-evaluates those rows and publishes what changed.
+    def __init__(self, engine):
+        self.engine = engine
+        self.active = {}
+        self.callbacks = []
+        self.queues = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self.lock:
+            self.callbacks.append(callback)
+        return callback
+
+    def subscribe_queue(self, maxsize=1000):
+        events = queue.Queue(maxsize=maxsize)
+        with self.lock:
+            self.queues.append(events)
+        return events
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            if subscriber in self.callbacks:
+                self.callbacks.remove(subscriber)
+            if subscriber in self.queues:
+                self.queues.remove(subscriber)
+
+    def prime(self, snapshot, avg_demand, now=None):
+        alerts = self.engine.evaluate(snapshot, avg_demand, now)
+        with self.lock:
+            self.active = self.group(alerts)
+
+    def group(self, alerts):
+        grouped = {}
+        for alert in alerts.to_dict('records'):
+            record = alert_record(alert)
+            grouped.setdefault(record['product_id'], {})[record['type']] = record
+        return grouped
+
+    def update(self, snapshot, avg_demand, now=None):
+        alerts = self.group(self.engine.evaluate(snapshot, avg_demand, now))
+        events = []
+        with self.lock:
+            for product_id in snapshot['product_id'].to_numpy():
+                product_id = int(product_id)
+                previous = self.active.get(product_id, {})
+                current = alerts.get(product_id, {})
+                for alert_type in current.keys() - previous.keys():
+                    events.append({'event': 'raised', 'alert': current[alert_type]})
+                for alert_type in previous.keys() - current.keys():
+                    events.append({'event': 'cleared', 'alert': previous[alert_type]})
+                if current:
+                    self.active[product_id] = current
+                else:
+                    self.active.pop(product_id, None)
+            callbacks = list(self.callbacks)
+            queues = list(self.queues)
+
+        for event in events:
+            self.publish(event, callbacks, queues)
+        return events
+
+    def publish(self, event, callbacks, queues):
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in alert subscriber: {str(e)}")
+        for events in queues:
+            # Slow consumers lose their oldest events rather than blocking ingestion.
+            while True:
+                try:
+                    events.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        events.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def active_alerts(self):
+        with self.lock:
+            return [alert for alerts in self.active.values() for alert in alerts.values()]
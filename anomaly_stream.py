@@ -0,0 +1,268 @@
+import time
+import threading
+import numpy as np
+import pandas as pd
+
+ORDER_FEATURE_SETS = {
+    'shipping': ['Days_for_shipping_real', 'Days_for_shipment_scheduled', 'Benefit_per_order'],
+    'delivery': ['Days_for_shipping_real', 'slippage', 'Late_delivery_risk']
+}
+
+
+def order_value(record, column):
+    if column == 'slippage':
+        return record['Days_for_shipping_real'] - record['Days_for_shipment_scheduled']
+    return record[column]
+
+
+def order_matrix(orders, columns):
+    values = []
+    for column in columns:
+        if column == 'slippage':
+            values.append(
+                orders['Days_for_shipping_real'].to_numpy(dtype=np.float64) -
+                orders['Days_for_shipment_scheduled'].to_numpy(dtype=np.float64)
+            )
+        else:
+            values.append(orders[column].to_numpy(dtype=np.float64))
+    return np.column_stack(values)
+
+
+def average_path_length(n_samples):
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        length = 2.0 * (np.log(n_samples - 1.0) + np.euler_gamma) - 2.0 * (n_samples - 1.0) / n_samples
+    return np.where(n_samples <= 1, 0.0, np.where(n_samples == 2, 1.0, length))
+
+
+class CompiledForest:
+    # A fitted StandardScaler + IsolationForest flattened into node arrays, so
+    # a record is scored with a few numpy gathers per tree level instead of
+    # going through sklearn's input validation and one apply() per tree.
+    # Scores match IsolationForest.decision_function (negative = anomaly).
+    def __init__(self, scaler, forest, n_samples):
+        self.mean = scaler.mean_.copy()
+        self.scale = scaler.scale_.copy()
+        self.offset = forest.offset_
+        self.n_samples = n_samples
+        self.fitted_at = time.time()
+
+        features, thresholds, children, leaf_values, roots = [], [], [], [], []
+        start = 0
+        for estimator, estimator_features in zip(forest.estimators_, forest.estimators_features_):
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            internal = nodes[~leaf]
+            depth = np.zeros(tree.node_count)
+            for _ in range(tree.max_depth):
+                depth[tree.children_left[internal]] = depth[internal] + 1
+                depth[tree.children_right[internal]] = depth[internal] + 1
+
+            # Leaves point back at themselves so every record can take
+            # max_depth steps. Each node owns slots 2 * node (right) and
+            # 2 * node + 1 (left), so the next slot is children[slot + went_left].
+            left = 2 * (np.where(leaf, nodes, tree.children_left) + start)
+            right = 2 * (np.where(leaf, nodes, tree.children_right) + start)
+            features.append(np.repeat(np.where(leaf, 0, np.asarray(estimator_features)[np.maximum(tree.feature, 0)]), 2))
+            thresholds.append(np.repeat(np.where(leaf, np.inf, tree.threshold), 2))
+            children.append(np.column_stack([right, left]).ravel())
+            leaf_values.append(np.repeat(np.where(leaf, depth + average_path_length(tree.n_node_samples), 0.0), 2))
+            roots.append(2 * start)
+            start += tree.node_count
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.children = np.concatenate(children)
+        self.leaf_value = np.concatenate(leaf_values)
+        self.roots = np.array(roots)
+        self.max_depth = max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        self.denominator = len(forest.estimators_) * float(average_path_length(forest.max_samples_))
+
+    def transform(self, X):
+        # Trees compare float32 inputs, as sklearn does.
+        return ((np.asarray(X, dtype=np.float64) - self.mean) / self.scale).astype(np.float32)
+
+    def score(self, X):
+        X = np.atleast_2d(self.transform(X))
+        rows = np.arange(len(X))[:, None]
+        slot = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            slot = self.children[slot + (X[rows, self.feature[slot]] <= self.threshold[slot])]
+        return -2 ** (-self.leaf_value[slot].sum(axis=1) / self.denominator) - self.offset
+
+    def score_one(self, x):
+        x = self.transform(x)
+        slot = self.roots
+        for _ in range(self.max_depth):
+            slot = self.children[slot + (x[self.feature[slot]] <= self.threshold[slot])]
+        return -2 ** (-self.leaf_value[slot].sum() / self.denominator) - self.offset
+
+
+class WindowDetector:
+    # Sliding window over the most recent records of one feature set and the
+    # model last fitted on it. Every fit builds its own scaler and forest, and
+    # the compiled model is swapped in whole so scoring never sees a half fit.
+    def __init__(self, columns, window_size=5000, contamination=0.1, n_estimators=100, random_state=42):
+        self.columns = list(columns)
+        self.window = np.empty((window_size, len(self.columns)))
+        self.position = 0
+        self.count = 0
+        self.pending = 0
+        self.contamination = contamination
+        self.n_estimators = n_estimators
+        self.random_state = random_state
+        self.model = None
+        self.lock = threading.Lock()
+
+    def add(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        X = X[np.isfinite(X).all(axis=1)][-len(self.window):]
+        if len(X) == 0:
+            return
+        with self.lock:
+            index = (self.position + np.arange(len(X))) % len(self.window)
+            self.window[index] = X
+            self.position = (self.position + len(X)) % len(self.window)
+            self.count = min(self.count + len(X), len(self.window))
+            self.pending += len(X)
+
+    def add_one(self, x):
+        if not np.isfinite(x).all():
+            return
+        with self.lock:
+            self.window[self.position] = x
+            self.position = (self.position + 1) % len(self.window)
+            self.count = min(self.count + 1, len(self.window))
+            self.pending += 1
+
+    def fit(self):
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+
+        with self.lock:
+            X = self.window[:self.count].copy()
+            self.pending = 0
+        if len(X) < 2:
+            return None
+        scaler = StandardScaler().fit(X)
+        forest = IsolationForest(
+            n_estimators=self.n_estimators,
+            contamination=self.contamination,
+            random_state=self.random_state
+        ).fit(scaler.transform(X))
+        self.model = CompiledForest(scaler, forest, len(X))
+        return self.model
+
+    def score(self, X):
+        model = self.model
+        if model is None:
+            return np.full(len(X), np.nan)
+        return model.score(X)
+
+    def score_one(self, x):
+        model = self.model
+        if model is None:
+            return np.nan
+        return float(model.score_one(x))
+
+
+class StreamingAnomalyDetector:
+    # Scores SC order records as they arrive against models fitted on a
+    # sliding window of recent orders; a background worker refits the
+    # window models every refit_interval seconds when new orders came in.
+    def __init__(self, feature_sets=None, window_size=5000, refit_interval=300, min_new_records=1,
+                 contamination=0.1, random_state=42):
+        self.detectors = {
+            name: WindowDetector(columns, window_size, contamination, random_state=random_state)
+            for name, columns in (feature_sets or ORDER_FEATURE_SETS).items()
+        }
+        self.refit_interval = refit_interval
+        self.min_new_records = min_new_records
+        self.refits = 0
+        self.last_refit = None
+        self.refit_seconds = None
+        self.stop_event = threading.Event()
+        self.worker = None
+
+    def prime(self, orders):
+        self.add(orders)
+        return self.refit(force=True)
+
+    def add(self, orders):
+        for detector in self.detectors.values():
+            detector.add(order_matrix(orders, detector.columns))
+
+    def refit(self, force=False):
+        start = time.perf_counter()
+        fitted = [
+            name for name, detector in self.detectors.items()
+            if (force or detector.pending >= self.min_new_records) and detector.fit() is not None
+        ]
+        if fitted:
+            self.refits += 1
+            self.last_refit = time.time()
+            self.refit_seconds = time.perf_counter() - start
+        return fitted
+
+    def run(self):
+        while not self.stop_event.wait(self.refit_interval):
+            try:
+                self.refit()
+            except Exception as e:
+                print(f"Error refitting anomaly detectors: {str(e)}")
+
+    def start(self):
+        if self.worker is None or not self.worker.is_alive():
+            self.stop_event.clear()
+            self.worker = threading.Thread(target=self.run, name='anomaly-refit', daemon=True)
+            self.worker.start()
+        return self.worker
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        if self.worker is not None:
+            self.worker.join(timeout)
+
+    def score_record(self, record):
+        return {
+            name: detector.score_one(np.array([order_value(record, column) for column in detector.columns]))
+            for name, detector in self.detectors.items()
+        }
+
+    def observe(self, record):
+        scores = {}
+        for name, detector in self.detectors.items():
+            x = np.array([order_value(record, column) for column in detector.columns], dtype=np.float64)
+            scores[name] = detector.score_one(x)
+            detector.add_one(x)
+        flagged = [name for name, score in scores.items() if score < 0]
+        return {
+            'anomalous': bool(flagged),
+            'feature_sets': flagged,
+            'late': bool(record['Days_for_shipping_real'] > record['Days_for_shipment_scheduled']),
+            'scores': scores
+        }
+
+    def score(self, orders):
+        scores = pd.DataFrame({
+            name: detector.score(order_matrix(orders, detector.columns))
+            for name, detector in self.detectors.items()
+        }, index=orders.index)
+        scores['late'] = orders['Days_for_shipping_real'].to_numpy() > orders['Days_for_shipment_scheduled'].to_numpy()
+        scores['anomalous'] = (scores[list(self.detectors)] < 0).any(axis=1)
+        return scores
+
+    def observe_many(self, orders):
+        scores = self.score(orders)
+        self.add(orders)
+        return scores
+
+    def status(self):
+        return {
+            'running': self.worker is not None and self.worker.is_alive(),
+            'refits': self.refits,
+            'last_refit': self.last_refit,
+            'refit_seconds': self.refit_seconds,
+            'windows': {name: detector.count for name, detector in self.detectors.items()}
+        }
@@ -1,9 +1,11 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from dashboard import create_dash_app
 import visual as viz
 from main_sys import HospitalSupplyChainSystem
 import numpy as np
 import traceback
+import json
+import queue
 from geopy.distance import geodesic
 import plotly.graph_objs as go
 from flask_cors import CORS
@@ -38,13 +40,15 @@ def inventory_status():
 @app.route('/supplier_risks')
 def supplier_risks():
     try:
-        risks = system.risk_assessor.assess_all_supplier_risks()
+        risks = system.risk_assessor.risk_store.latest_scores()
+        trends = system.risk_assessor.risk_store.trends()
         chart = viz.create_risk_heatmap(risks)
         
         monte_carlo_results = system.risk_assessor.monte_carlo_simulation(1)
         
         return jsonify({
             "chart": chart, 
+            "trends": trends.reset_index().to_dict('records'),
             "monte_carlo_chart": monte_carlo_results['chart'],
             "monte_carlo_stats": {
                 "mean_lead_time": monte_carlo_results['mean_lead_time'],
@@ -99,7 +103,8 @@ def optimized_route():
 def demand_forecast():
     try:
         product_id = int(request.args.get('product_id', 1))
-        forecast = system.inventory_system.forecast_demand(product_id, days=30)
+        result = system.inventory_system.forecast_with_chart(product_id, days=30)
+        forecast = result['forecast']
         
 
         print(f"Forecast for product {product_id}:")
@@ -107,7 +112,7 @@ def demand_forecast():
         print(f"  Shape/Length: {forecast.shape if hasattr(forecast, 'shape') else len(forecast)}")
         print(f"  First few values: {forecast[:5]}")
         
-        chart_data = system.inventory_system.visualize_forecast(product_id, forecast)
+        chart_data = result['chart']
         forecast_array = forecast.to_numpy() if hasattr(forecast, 'to_numpy') else np.array(forecast)
 
         stats = {
@@ -123,6 +128,9 @@ def demand_forecast():
         return jsonify({
             "chart": chart_data, 
             "forecast": forecast_array.tolist(),
+            "lower": np.asarray(result['lower']).tolist(),
+            "upper": np.asarray(result['upper']).tolist(),
+            "backend": result['backend'],
             "stats": stats,
             "product_id": product_id
         })
@@ -134,6 +142,72 @@ def demand_forecast():
         
         return jsonify({"error": f"Error generating demand forecast: {str(e)}"})
 
+@app.route('/alerts')
+def inventory_alerts():
+    try:
+        result = system.inventory_system.get_alerts(
+            page=int(request.args.get('page', 1)),
+            page_size=int(request.args.get('page_size', 50)),
+            alert_type=request.args.get('type'),
+            min_severity=request.args.get('min_severity')
+        )
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": f"Error generating alerts: {str(e)}"})
+
+@app.route('/alerts/stream')
+def alert_stream():
+    monitor = system.inventory_system.alert_monitor
+    events = monitor.subscribe_queue()
+
+    def stream():
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=15)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event['alert'])}\n\n"
+        finally:
+            monitor.unsubscribe(events)
+
+    return Response(stream(), mimetype='text/event-stream')
+
+@app.route('/inventory/stock_movement', methods=['POST'])
+def stock_movement():
+    try:
+        payload = request.get_json(force=True)
+        product_id = int(payload['product_id'])
+        stock_level = system.inventory_system.record_stock_movement(product_id, float(payload['quantity']))
+        return jsonify({"product_id": product_id, "stock_level": float(stock_level)})
+    except ValueError as e:
+        return jsonify({"error": f"Invalid stock movement: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Error recording stock movement: {str(e)}"})
+
+@app.route('/supplier_risks/update', methods=['POST'])
+def update_supplier_risk():
+    try:
+        payload = request.get_json(force=True)
+        supplier_id = int(payload['supplier_id'])
+        system.risk_assessor.update_supplier(supplier_id, reason=payload.get('reason', 'update'), **payload['attributes'])
+        return jsonify({"supplier_id": supplier_id, "risk": system.risk_assessor.risk_store.latest[supplier_id]})
+    except Exception as e:
+        return jsonify({"error": f"Error updating supplier risk: {str(e)}"})
+
+@app.route('/supplier_orders', methods=['POST'])
+def supplier_orders():
+    try:
+        payload = request.get_json(force=True)
+        orders = payload['orders'] if isinstance(payload, dict) else payload
+        flags = system.record_supplier_orders(orders)
+        return jsonify({"orders": flags.to_dict('records')})
+    except Exception as e:
+        error_details = traceback.format_exc()
+        print(f"Error recording supplier orders: {error_details}")
+        return jsonify({"error": f"Error recording supplier orders: {str(e)}"})
+
 def create_fallback_chart(product_id, forecast):
     try:
         days = [f"Day {i+1}" for i in range(len(forecast))]
@@ -218,16 +292,41 @@ def medicine_classification():
         
         return jsonify({"error": f"Error classifying medicines: {str(e)}"})
 
+@app.route('/medicine_classification/refit', methods=['POST'])
+def refit_medicine_classification():
+    try:
+        classification = system.refit_medicine_classifier()
+        return jsonify({"classification": classification})
+    except Exception as e:
+        error_details = traceback.format_exc()
+        print(f"Error refitting medicine classifier: {error_details}")
+        return jsonify({"error": f"Error refitting medicine classifier: {str(e)}"})
+
+@app.route('/medicine_classification/classify', methods=['POST'])
+def classify_new_medicines():
+    try:
+        payload = request.get_json(force=True)
+        medicines = payload['medicines'] if isinstance(payload, dict) else payload
+        classified = system.medicine_classifier.classify(medicines)
+        return jsonify({"medicines": classified.to_dict('records')})
+    except Exception as e:
+        error_details = traceback.format_exc()
+        print(f"Error classifying new medicines: {error_details}")
+        return jsonify({"error": f"Error classifying new medicines: {str(e)}"})
+
 @app.route('/api/status')
 def api_status():
     """API endpoint for system status"""
+    components = system.component_status()
     return jsonify({
         "status": "online",
+        "ready": all(component['status'] == 'ready' for component in components.values()),
         "components": {
-            "inventory_system": "operational",
-            "risk_assessment": "operational",
-            "route_optimization": "operational",
-            "medicine_classification": "operational"
+            "inventory_system": components['inventory_system'],
+            "risk_assessment": components['risk_assessor'],
+            "route_optimization": components['route_optimizer'],
+            "medicine_classification": components['medicine_classifier'],
+            "risk_mitigation": components['risk_mitigator']
         },
         "version": "1.0.0"
     })
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import adjusted_rand_score, silhouette_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classifier import MedicineClassifier
+
+CONFIGURATIONS = [
+    {'clustering_backend': 'kmeans', 'vectorizer_backend': 'tfidf'},
+    {'clustering_backend': 'minibatch', 'vectorizer_backend': 'tfidf'},
+    {'clustering_backend': 'minibatch', 'vectorizer_backend': 'tfidf', 'n_components': 100},
+    {'clustering_backend': 'minibatch', 'vectorizer_backend': 'hashing'},
+    {'clustering_backend': 'minibatch', 'vectorizer_backend': 'hashing', 'n_components': 100},
+]
+
+COMPOSITIONS = [
+    'Azithromycin', 'Cefixime', 'Ofloxacin', 'Paracetamol', 'Aceclofenac', 'Nimesulide',
+    'Telmisartan', 'Amlodipine', 'Metformin', 'Glimepiride', 'Insulin', 'Levocetirizine',
+    'Montelukast', 'Pantoprazole', 'Omeprazole', 'Vitamin D3', 'Multivitamin', 'Epinephrine'
+]
+FORMS = ['Tablet', 'Capsule', 'Syrup', 'Injection', 'Cream', 'Drops']
+
+
+def synthetic_catalogue(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    first = rng.choice(COMPOSITIONS, n_rows)
+    second = rng.choice(COMPOSITIONS + [''] * len(COMPOSITIONS), n_rows)
+    strength = rng.choice([5, 10, 50, 100, 250, 500, 650], n_rows)
+    brand = np.char.add('Brand', rng.integers(0, n_rows // 5 + 1, n_rows).astype(str))
+    names = [f"{b} {s} {f}" for b, s, f in zip(brand, strength, rng.choice(FORMS, n_rows))]
+    return pd.DataFrame({
+        'name': names,
+        'short_composition1': [f"{c} ({s}mg)" for c, s in zip(first, strength)],
+        'short_composition2': [f"{c} ({s}mg)" if c else None for c, s in zip(second, strength)]
+    })
+
+
+def run(path, configurations, n_jobs, sample_size):
+    baseline_labels = None
+    baseline_features = None
+    sample = None
+    print(f"{'configuration':<58} {'seconds':>8} {'silhouette':>11} {'ARI vs kmeans':>14}")
+    for params in configurations:
+        classifier = MedicineClassifier(path, n_jobs=n_jobs, **params)
+        classifier.preprocess_data()
+        start = time.perf_counter()
+        classifier.cluster_medicines()
+        elapsed = time.perf_counter() - start
+        labels = classifier.df['cluster'].to_numpy()
+
+        # Quality is scored in the same baseline TF-IDF space for every run.
+        if baseline_features is None:
+            baseline = MedicineClassifier(path)
+            baseline.preprocess_data()
+            baseline_features = baseline.vectorizer.fit_transform(baseline.df['text_for_clustering'])
+            sample = np.random.default_rng(0).choice(len(labels), min(sample_size, len(labels)), replace=False)
+        silhouette = silhouette_score(baseline_features[sample], labels[sample], metric='cosine')
+        if baseline_labels is None:
+            baseline_labels = labels
+        ari = adjusted_rand_score(baseline_labels, labels)
+
+        name = ', '.join(f"{key}={value}" for key, value in params.items() if key != 'clustering_backend')
+        name = f"{params['clustering_backend']} ({name})"
+        print(f"{name:<58} {elapsed:>8.2f} {silhouette:>11.3f} {ari:>14.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare MedicineClassifier clustering backends")
+    parser.add_argument('--data', default=None, help="medicine catalogue CSV")
+    parser.add_argument('--synthetic', type=int, default=50000, help="rows of synthetic catalogue when --data is not given")
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--sample-size', type=int, default=5000, help="rows used for the silhouette score")
+    args = parser.parse_args()
+
+    if args.data:
+        run(args.data, CONFIGURATIONS, args.n_jobs, args.sample_size)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'medicines.csv')
+            synthetic_catalogue(args.synthetic).to_csv(path, index=False)
+            run(path, CONFIGURATIONS, args.n_jobs, args.sample_size)
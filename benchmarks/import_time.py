@@ -0,0 +1,52 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ['classifier', 'ims1', 'risk_assess', 'route_opt', 'mitigation_rec', 'main_sys']
+HEAVY_MODULES = ['sklearn', 'scipy.stats', 'scipy.optimize', 'neuralprophet', 'torch', 'folium']
+
+# Each import runs in a fresh interpreter so modules loaded by an earlier
+# measurement don't make later ones look cheap.
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeats=3):
+    runs = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            return {'error': error[-1] if error else f"exit code {result.returncode}"}
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        'seconds': min(run['seconds'] for run in runs),
+        'loaded': runs[-1]['loaded']
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure cold import time of the system modules")
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'module':<16} {'seconds':>8}  heavy modules loaded")
+    for module in args.modules:
+        result = measure(module, args.repeats)
+        if 'error' in result:
+            print(f"{module:<16} {'failed':>8}  {result['error']}")
+        else:
+            print(f"{module:<16} {result['seconds']:>8.2f}  {', '.join(result['loaded']) or '-'}")
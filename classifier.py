@@ -1,18 +1,82 @@
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
 import os
+import re
+import glob
+import pickle
+import hashlib
+import threading
 from collections import defaultdict
 
 os.environ["LOKY_MAX_CPU_COUNT"] = "4"
 medicine_data_path = "A_Z_medicines_dataset_of_India.csv"
 
+CLUSTERING_BACKENDS = ['kmeans', 'minibatch']
+VECTORIZER_BACKENDS = ['tfidf', 'hashing']
+ARTIFACT_VERSION = 2
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def transform_chunk(vectorizer, reducer, texts):
+    features = vectorizer.transform(texts)
+    return features if reducer is None else reducer.transform(features)
+
+
 class MedicineClassifier:
-    def __init__(self, medicine_data_path):
+    def __init__(self, medicine_data_path, clustering_backend='kmeans', vectorizer_backend='tfidf',
+                 n_clusters=10, n_components=None, batch_size=10000, n_epochs=1, n_jobs=None,
+                 n_hash_features=2 ** 18, reducer_sample_size=20000, artifact_dir=None):
+        if clustering_backend not in CLUSTERING_BACKENDS:
+            raise ValueError(f"Unknown clustering backend: {clustering_backend}")
+        if vectorizer_backend not in VECTORIZER_BACKENDS:
+            raise ValueError(f"Unknown vectorizer backend: {vectorizer_backend}")
+
+        # scikit-learn takes seconds to import, so it's only loaded once a
+        # classifier is actually built.
+        from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
+        from sklearn.cluster import KMeans, MiniBatchKMeans
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import Normalizer
+        from sklearn.feature_selection import VarianceThreshold
+
+        self.medicine_data_path = medicine_data_path
         self.df = pd.read_csv(medicine_data_path)
-        self.vectorizer = TfidfVectorizer(stop_words='english')
-        self.kmeans = KMeans(n_clusters=10, random_state=42)
+        self.clustering_backend = clustering_backend
+        self.vectorizer_backend = vectorizer_backend
+        self.batch_size = batch_size
+        self.n_epochs = n_epochs
+        self.n_jobs = n_jobs
+        self.reducer_sample_size = reducer_sample_size
+
+        if vectorizer_backend == 'hashing':
+            # Stateless, so chunks can be vectorized independently and in parallel
+            # without a vocabulary pass over the whole catalogue.
+            self.vectorizer = HashingVectorizer(stop_words='english', n_features=n_hash_features, alternate_sign=False)
+        else:
+            self.vectorizer = TfidfVectorizer(stop_words='english')
+        self.reducer = None
+        if n_components:
+            # Columns absent from the fit sample are dropped before the SVD; they
+            # would get zero loadings anyway and dominate its cost when hashing.
+            self.reducer = make_pipeline(
+                VarianceThreshold(),
+                TruncatedSVD(n_components=n_components, random_state=42),
+                Normalizer(copy=False)
+            )
+        self.hashed_feature_names = None
+
+        if clustering_backend == 'minibatch':
+            self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42)
+        else:
+            self.kmeans = KMeans(n_clusters=n_clusters, random_state=42)
         self.disease_priority = {
             # Life-saving/Emergency medicines
             'injection': 0.9,  
@@ -43,6 +107,8 @@ class MedicineClassifier:
             'allergy': 0.4,
             'levocetirizine': 0.4
         }
+        self.priority_modifiers = ['injection', 'high dose', 'strong']
+        self.keyword_matcher = self.build_keyword_matcher()
         self.cluster_categories = {
             'diabetes': ['glimepiride', 'metformin', 'insulin'],
             'antibiotics': ['azithromycin', 'ofloxacin', 'cefixime'],
@@ -55,41 +121,235 @@ class MedicineClassifier:
             'supplements': ['vitamin', 'supplement', 'mineral'],
             'general': ['tablet', 'capsule', 'syrup']
         }
+
+        # Everything that changes the fitted result is part of the artifact key.
+        self.fit_params = {
+            'clustering_backend': clustering_backend,
+            'vectorizer_backend': vectorizer_backend,
+            'n_clusters': n_clusters,
+            'n_components': n_components,
+            'n_hash_features': n_hash_features if vectorizer_backend == 'hashing' else None
+        }
+        self.artifact_dir = artifact_dir
+        self.data_hash = None
+        self.cluster_summaries = None
+        self.substitute_index = None
+        self.lock = threading.RLock()
+        if artifact_dir is not None:
+            os.makedirs(artifact_dir, exist_ok=True)
+            self.data_hash = file_digest(medicine_data_path)
+            self.load_artifact()
+
+    def artifact_path(self):
+        key = hashlib.sha1(repr((ARTIFACT_VERSION, self.data_hash, sorted(self.fit_params.items()))).encode()).hexdigest()[:16]
+        return os.path.join(self.artifact_dir, f"medicine_classifier_{key}.pkl")
+
+    def load_artifact(self):
+        import sklearn
+
+        path = self.artifact_path()
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "rb") as file:
+                artifact = pickle.load(file)
+        except Exception as e:
+            print(f"Error loading classifier artifact {path}: {str(e)}")
+            return False
+        if artifact['version'] != ARTIFACT_VERSION or artifact['sklearn_version'] != sklearn.__version__:
+            print(f"Ignoring classifier artifact {path} built with an incompatible version")
+            return False
+
+        with self.lock:
+            self.preprocess_data()
+            self.vectorizer = artifact['vectorizer']
+            self.reducer = artifact['reducer']
+            self.kmeans = artifact['kmeans']
+            self.hashed_feature_names = None
+            self.substitute_index = None
+            self.df['cluster'] = artifact['cluster']
+            self.df['priority'] = artifact['priority']
+            self.cluster_summaries = artifact['cluster_summaries']
+        print(f"Loaded classifier artifact {path}")
+        return True
+
+    def save_artifact(self):
+        import sklearn
+
+        path = self.artifact_path()
+        artifact = {
+            'version': ARTIFACT_VERSION,
+            'sklearn_version': sklearn.__version__,
+            'data_hash': self.data_hash,
+            'fit_params': self.fit_params,
+            'vectorizer': self.vectorizer,
+            'reducer': self.reducer,
+            'kmeans': self.kmeans,
+            'cluster': self.df['cluster'].to_numpy(dtype=np.int32),
+            'priority': self.df['priority'].to_numpy(dtype=np.float64),
+            'cluster_summaries': self.cluster_summaries
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(artifact, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+        # Artifacts for an older catalogue or other settings are superseded.
+        for stale in glob.glob(os.path.join(self.artifact_dir, "medicine_classifier_*.pkl")):
+            if stale != path:
+                os.remove(stale)
+        return path
     def preprocess_data(self):
         self.df['text_for_clustering'] = self.df['name'] + ' ' + self.df['short_composition1'] + ' ' + self.df['short_composition2'].fillna('')
         
         self.df['text_for_clustering'] = self.df['text_for_clustering'].str.lower()
 
+    def medicine_texts(self, medicines):
+        # Accepts a DataFrame or records with the catalogue's name/composition
+        # columns, or plain strings that are already name + composition.
+        if isinstance(medicines, str):
+            medicines = [medicines]
+        if not isinstance(medicines, pd.DataFrame):
+            medicines = pd.DataFrame([{'name': item} if isinstance(item, str) else item for item in medicines])
+        parts = medicines.reindex(columns=['name', 'short_composition1', 'short_composition2']).fillna('').astype(str)
+        texts = parts['name'] + ' ' + parts['short_composition1'] + ' ' + parts['short_composition2']
+        return medicines, texts.str.lower()
+
+    def classify(self, medicines):
+        medicines, texts = self.medicine_texts(medicines)
+        with self.lock:
+            if self.cluster_summaries is None:
+                self.run_classification()
+            features = transform_chunk(self.vectorizer, self.reducer, texts)
+            clusters = self.kmeans.predict(features)
+            names = {summary['cluster_id']: name for name, summary in self.cluster_summaries.items()}
+
+        return pd.DataFrame({
+            'name': medicines['name'].to_numpy(),
+            'cluster': clusters,
+            'cluster_name': [names.get(cluster) for cluster in clusters],
+            'priority': self.score_priorities(texts)['priority']
+        }, index=medicines.index)
+
     def cluster_medicines(self):
-        tfidf_matrix = self.vectorizer.fit_transform(self.df['text_for_clustering'])
+        texts = self.df['text_for_clustering']
+        if self.clustering_backend == 'minibatch':
+            self.fit_features(texts, sample_only=True)
+            for _ in range(self.n_epochs):
+                for features in self.iter_features(texts):
+                    self.kmeans.partial_fit(features)
+            self.df['cluster'] = np.concatenate([self.kmeans.predict(features) for features in self.iter_features(texts)])
+            return
+
+        tfidf_matrix = self.fit_features(texts)
         
         self.kmeans.fit(tfidf_matrix)
         self.df['cluster'] = self.kmeans.labels_
 
+    def fit_features(self, texts, sample_only=False):
+        # Fits the vocabulary (TF-IDF only) and the SVD reducer. With sample_only
+        # the reducer is fitted on a random sample so memory stays bounded.
+        self.hashed_feature_names = None
+        if self.vectorizer_backend == 'hashing':
+            features = None if sample_only else self.vectorizer.transform(texts)
+        elif sample_only:
+            self.vectorizer.fit(texts)
+            features = None
+        else:
+            features = self.vectorizer.fit_transform(texts)
+        if self.reducer is None:
+            return features
+
+        if sample_only:
+            sample = texts.sample(min(len(texts), self.reducer_sample_size), random_state=42)
+            self.reducer.fit(self.vectorizer.transform(sample))
+            return None
+        return self.reducer.fit_transform(features)
+
+    def iter_features(self, texts):
+        from joblib import Parallel, delayed
+
+        chunks = [texts.iloc[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        if self.n_jobs in (None, 1):
+            for chunk in chunks:
+                yield transform_chunk(self.vectorizer, self.reducer, chunk)
+            return
+
+        # Vectorize one wave of chunks per worker at a time so at most
+        # n_jobs chunks of features are held in memory.
+        with Parallel(n_jobs=self.n_jobs) as parallel:
+            wave = parallel.n_jobs if parallel.n_jobs > 0 else os.cpu_count()
+            for start in range(0, len(chunks), wave):
+                yield from parallel(
+                    delayed(transform_chunk)(self.vectorizer, self.reducer, chunk)
+                    for chunk in chunks[start:start + wave]
+                )
+
+    def feature_names(self):
+        if self.vectorizer_backend != 'hashing':
+            return self.vectorizer.get_feature_names_out()
+        if self.hashed_feature_names is None:
+            # Hashed columns have no names, so recover them by hashing every
+            # token seen in the catalogue; colliding tokens share a column.
+            analyzer = self.vectorizer.build_analyzer()
+            tokens = sorted({token for text in self.df['text_for_clustering'].dropna() for token in analyzer(text)})
+            hashed = self.vectorizer.transform(tokens).tocsr()
+            names = np.full(self.vectorizer.n_features, '', dtype=object)
+            names[hashed.indices] = np.repeat(np.array(tokens, dtype=object), np.diff(hashed.indptr))
+            self.hashed_feature_names = names
+        return self.hashed_feature_names
+
+    def term_centers(self):
+        centers = self.kmeans.cluster_centers_
+        if self.reducer is not None:
+            centers = self.reducer.named_steps['truncatedsvd'].inverse_transform(centers)
+            centers = self.reducer.named_steps['variancethreshold'].inverse_transform(centers)
+        return centers
+
+    def build_keyword_matcher(self):
+        # One lookahead alternation finds every keyword occurrence in a single scan,
+        # longest first. A hit on a keyword also implies any keyword that is its
+        # prefix, since both start at that position.
+        terms = list(dict.fromkeys(list(self.disease_priority) + self.priority_modifiers))
+        ordered = sorted(terms, key=len, reverse=True)
+        pattern = re.compile('(?=(' + '|'.join(re.escape(term) for term in ordered) + '))')
+        implied = np.array([[a.startswith(b) for b in terms] for a in terms])
+        return pattern, terms, implied
+
+    def match_keywords(self, texts):
+        pattern, terms, implied = self.keyword_matcher
+        term_index = {term: i for i, term in enumerate(terms)}
+        found = texts.str.findall(pattern).explode().dropna()
+
+        presence = np.zeros((len(texts), len(terms)), dtype=bool)
+        rows = texts.index.get_indexer(found.index)
+        presence[rows, found.map(term_index).to_numpy(dtype=np.int64)] = True
+        presence = (presence.astype(np.int32) @ implied.astype(np.int32)) > 0
+        return {term: presence[:, i] for i, term in enumerate(terms)}
+
+    def score_priorities(self, texts):
+        texts = pd.Series(texts).astype(str).str.lower().reset_index(drop=True)
+        present = self.match_keywords(texts)
+
+        # Accumulate in dictionary order so the sums match a per-row loop exactly.
+        total_priority = np.zeros(len(texts))
+        matches = np.zeros(len(texts), dtype=np.int64)
+        for keyword, priority in self.disease_priority.items():
+            total_priority += np.where(present[keyword], priority, 0.0)
+            matches += present[keyword]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            priority = np.where(matches > 0, total_priority / matches, 0.0)
+        priority = np.where(present['injection'], priority * 1.2, priority)
+        priority = np.where(present['high dose'] | present['strong'], priority * 1.1, priority)
+        return {
+            'matches': matches,
+            'total_priority': total_priority,
+            'priority': np.minimum(priority, 1.0)
+        }
+
     def assign_disease_categories(self):
-        self.df['priority'] = 0.0
-        
-        for medicine_idx in self.df.index:
-            total_priority = 0.0
-            matches = 0
-            
-            medicine_text = str(self.df.loc[medicine_idx, 'text_for_clustering']).lower()
-            
-            for keyword, priority in self.disease_priority.items():
-                if keyword in medicine_text:
-                    total_priority += priority
-                    matches += 1
-            
-            if matches > 0:
-                self.df.loc[medicine_idx, 'priority'] = total_priority / matches
-            
-            if 'injection' in medicine_text:
-                self.df.loc[medicine_idx, 'priority'] *= 1.2
-                
-            if 'high dose' in medicine_text or 'strong' in medicine_text:
-                self.df.loc[medicine_idx, 'priority'] *= 1.1
-                
-            self.df.loc[medicine_idx, 'priority'] = min(self.df.loc[medicine_idx, 'priority'], 1.0)
+        self.df['priority'] = self.score_priorities(self.df['text_for_clustering'])['priority']
 
     def calculate_cluster_priority(self, cluster_id):
         cluster_medicines = self.df[self.df['cluster'] == cluster_id]
@@ -128,6 +388,7 @@ class MedicineClassifier:
             cluster_name = self.assign_cluster_names(cluster, top_terms)
             
             cluster_summaries[cluster_name] = {
+                'cluster_id': cluster,
                 'top_terms': top_terms,
                 'avg_priority': avg_priority,
                 'size': len(cluster_medicines)
@@ -135,26 +396,105 @@ class MedicineClassifier:
         return cluster_summaries
 
     def get_top_terms_per_cluster(self, cluster, top_n=5):
-        cluster_center = self.kmeans.cluster_centers_[cluster]
-        terms = self.vectorizer.get_feature_names_out()
+        cluster_center = self.term_centers()[cluster]
+        terms = self.feature_names()
         top_term_indices = cluster_center.argsort()[-top_n:][::-1]
         return [terms[i] for i in top_term_indices]
 
-    def run_classification(self):
-        self.preprocess_data()
-        self.cluster_medicines()
-        self.assign_disease_categories()
-        return self.get_cluster_summaries()
+    def build_substitute_index(self):
+        # Compositions in the fitted TF-IDF space, stored column-major: each column
+        # is the posting list of one term, so a query only touches rows sharing a
+        # term with it. Brand names are left out so they don't outweigh the
+        # active ingredients.
+        with self.lock:
+            if self.cluster_summaries is None:
+                self.run_classification()
+            if self.substitute_index is None:
+                names = self.df['name'].fillna('').str.lower()
+                compositions = self.df['short_composition1'].fillna('') + ' ' + self.df['short_composition2'].fillna('')
+                vectors = self.vectorizer.transform(compositions.str.lower()).tocsr()
+                self.substitute_index = {
+                    'vectors': vectors,
+                    'postings': vectors.tocsc(),
+                    'rows': dict(zip(names.iloc[::-1], range(len(names) - 1, -1, -1))),
+                    'name': self.df['name'].to_numpy(dtype=object),
+                    'short_composition1': self.df['short_composition1'].to_numpy(dtype=object),
+                    'short_composition2': self.df['short_composition2'].to_numpy(dtype=object),
+                    'priority': self.df['priority'].to_numpy(dtype=np.float64)
+                }
+            return self.substitute_index
+
+    def catalogue_name(self, name):
+        # Inventory product names carry a "-<product_id>" suffix; returns the
+        # catalogue spelling of the name, or None if it isn't a known medicine.
+        index = self.build_substitute_index()
+        name = str(name).strip()
+        for candidate in (name, re.sub(r'-\d+$', '', name)):
+            row = index['rows'].get(candidate.lower())
+            if row is not None:
+                return index['name'][row]
+        return None
+
+    def find_substitutes(self, medicine_name, k=5):
+        index = self.build_substitute_index()
+        row = index['rows'].get(str(medicine_name).lower())
+        if row is not None:
+            query = index['vectors'][row]
+        else:
+            # Not in the catalogue: treat the name as free text.
+            query = self.vectorizer.transform([str(medicine_name).lower()]).tocsr()
+
+        # Rows are L2-normalised, so the dot product is the cosine similarity.
+        scores = np.asarray(index['postings'][:, query.indices] @ query.data).ravel()
+        if row is not None:
+            scores[row] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        return [
+            {
+                'name': index['name'][i],
+                'short_composition1': index['short_composition1'][i],
+                'short_composition2': None if pd.isna(index['short_composition2'][i]) else index['short_composition2'][i],
+                'similarity': float(scores[i]),
+                'priority': float(index['priority'][i])
+            }
+            for i in candidates
+        ]
+
+    def run_classification(self, refit=False):
+        with self.lock:
+            if self.cluster_summaries is not None and not refit:
+                return self.cluster_summaries
+            self.preprocess_data()
+            self.cluster_medicines()
+            self.assign_disease_categories()
+            self.cluster_summaries = self.get_cluster_summaries()
+            self.substitute_index = None
+            if self.artifact_dir is not None:
+                self.save_artifact()
+            return self.cluster_summaries
+
+    def refit(self):
+        # Re-reads the catalogue, so a changed CSV gets a fresh artifact.
+        with self.lock:
+            self.df = pd.read_csv(self.medicine_data_path)
+            if self.artifact_dir is not None:
+                self.data_hash = file_digest(self.medicine_data_path)
+            return self.run_classification(refit=True)
 
 
-classifier = MedicineClassifier(medicine_data_path)
-cluster_summaries = classifier.run_classification()
+if __name__ == '__main__':
+    classifier = MedicineClassifier(medicine_data_path)
+    cluster_summaries = classifier.run_classification()
 
-for cluster_name, summary in cluster_summaries.items():
-    print(f"{cluster_name}:")
-    print(f"Top terms: {', '.join(summary['top_terms'])}")
-    print(f"Average priority: {summary['avg_priority']:.2f}")
-    print(f"Cluster size: {summary['size']}")
-    print()
+    for cluster_name, summary in cluster_summaries.items():
+        print(f"{cluster_name}:")
+        print(f"Top terms: {', '.join(summary['top_terms'])}")
+        print(f"Average priority: {summary['avg_priority']:.2f}")
+        print(f"Cluster size: {summary['size']}")
+        print()
 
-classified_medicines = classifier.df
\ No newline at end of file
+    classified_medicines = classifier.df
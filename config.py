@@ -1,8 +1,29 @@
 CONFIG = {
     'medicine_data_path': 'A_Z_medicines_dataset_of_India.csv',  
-    'inventory_data_path': 'inventory_data.csv',
-    'sc_data_path': 'SC.csv',
-    'sc2_data_path': 'SC2.csv',
+    'classifier_artifact_dir': 'models/classifier',
+    'inventory_data_path': 'dataset/inventory_data.csv',
+    'inventory_data_source': 'csv',
+    'inventory_cache_dir': 'cache',
+    'sc_data_path': 'dataset/SC.csv',
+    'sc2_data_path': 'dataset/SC2.csv',
+    'lead_time_distribution': 'truncnorm',
+    'anomaly_window_size': 5000,
+    'anomaly_refit_seconds': 300,
+    'disruption_scenarios': 5000,
+    'disruption_horizon_days': 30,
+    'disruption_workers': None,
+    'forecast_model_dir': 'models/forecast',
+    'forecast_workers': 4,
+    'forecast_backend': 'holt_winters',
+    'forecast_backend_tiers': {5: 'neuralprophet'},
+    'forecast_cache_mb': 64,
+    'alert_rules': {
+        'low_stock_days': 7,
+        'expiry_window_days': 30,
+        'expiry_urgent_days': 7,
+        'critical_min_criticality': 4,
+        'critical_stock_days': 14
+    },
     'hospital_address': "Medical College, Trivandrum, Kerala, India",
     'openweathermap_api_key': "open_weather_api",
     'tomtom_api_key': "tomtom_api"
@@ -64,7 +64,7 @@ def create_dash_app(flask_app, system):
                 fig = create_sample_inventory_graph()
             
         elif selected_metric == 'risks':
-            supplier_risks = risk_assessor.assess_all_supplier_risks()
+            supplier_risks = risk_assessor.risk_store.latest_scores()
             
             if supplier_risks:
                 df = pd.DataFrame(list(supplier_risks.items()), 
@@ -94,7 +94,7 @@ def create_dash_app(flask_app, system):
                 
         elif selected_metric == 'categories':
             try:
-                cluster_summaries = system.medicine_classifier.get_cluster_summaries()
+                cluster_summaries = system.classify_medicines()
                 
                 if cluster_summaries:
                     categories = list(cluster_summaries.keys())
@@ -127,9 +127,9 @@ def create_dash_app(flask_app, system):
     )
     def update_alerts(selected_metric):
         try:
-            alerts = ims.generate_alerts()
+            alerts = ims.generate_alerts(limit=5)
             if alerts:
-                return html.Ul([html.Li(alert) for alert in alerts[:5]])
+                return html.Ul([html.Li(alert) for alert in alerts])
             else:
                 return html.P("No critical alerts at this time.")
         except:
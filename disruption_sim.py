@@ -0,0 +1,281 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from lead_time_sim import LeadTimeSimulator
+from rl_env import ORDERING_COST, HOLDING_COST_RATE, STOCKOUT_COST_FACTOR
+
+# Share of a supplier's latent disruption risk explained by the common
+# weather and traffic shocks, at weather_risk / traffic_risk of 1.
+WEATHER_CORRELATION = 0.5
+TRAFFIC_CORRELATION = 0.3
+# Mean outage length for a supplier with no weather exposure.
+OUTAGE_DAYS = 5
+
+DEFAULT_OPTION = {
+    'dual_sourcing': None,
+    'backup_premium': 0.05,
+    'safety_stock_factor': 1.0,
+    'lead_time_factor': 1.0,
+    'ordering_cost_factor': 1.0,
+    'fixed_cost': 0.0
+}
+
+MITIGATION_OPTIONS = {
+    'baseline': {},
+    'dual_sourcing': {'dual_sourcing': 'all', 'fixed_cost': 2000.0},
+    'safety_stock': {'safety_stock_factor': 1.5},
+    'route_optimization': {'lead_time_factor': 0.8, 'ordering_cost_factor': 0.9},
+    'balanced': {'dual_sourcing': 'all', 'safety_stock_factor': 1.25, 'lead_time_factor': 0.9, 'fixed_cost': 2000.0}
+}
+
+
+def simulate_chunk(inputs, options, n_scenarios, seed):
+    # Every option is evaluated on the same draws (common random numbers):
+    # supplier failures, outage timing, lead times, supplier choice and the
+    # demand window only depend on the seed, so differences between options
+    # come from the options alone.
+    from scipy.special import ndtr
+
+    rng = np.random.default_rng(seed)
+    demand_history = inputs['demand']
+    n_products, n_days = demand_history.shape
+    horizon = inputs['horizon']
+    n_suppliers = len(inputs['supplier_ids'])
+    rows = np.arange(n_scenarios)[:, None]
+
+    weather_loading = inputs['weather_loading']
+    traffic_loading = inputs['traffic_loading']
+    latent = (
+        weather_loading * rng.standard_normal((n_scenarios, 1)) +
+        traffic_loading * rng.standard_normal((n_scenarios, 1)) +
+        np.sqrt(1 - weather_loading ** 2 - traffic_loading ** 2) * rng.standard_normal((n_scenarios, n_suppliers))
+    )
+    failed = ndtr(latent) < inputs['failure_probability']
+    outage_start = rng.integers(0, horizon, (n_scenarios, n_suppliers))
+    outage_end = outage_start + np.ceil(rng.standard_exponential((n_scenarios, n_suppliers)) * inputs['outage_days'])
+    outage_start = np.where(failed, outage_start, -1)
+    outage_end = np.where(failed, outage_end, -1)
+
+    lead_times = LeadTimeSimulator(
+        inputs['supplier_ids'], inputs['lead_time_mean'], inputs['lead_time_std'], inputs['distribution']
+    ).simulate(n_scenarios, rng=rng)
+    supplier = (rng.random((n_scenarios, n_products, 1)) > inputs['supplier_shares'][:, :-1]).sum(axis=2)
+    backup = inputs['backup'][supplier]
+    window_starts = rng.integers(0, n_days - horizon + 1, n_scenarios)
+    cumulative_demand = np.concatenate([np.zeros((n_products, 1)), np.cumsum(demand_history, axis=1)], axis=1)
+    total_demand = (cumulative_demand[:, window_starts + horizon] - cumulative_demand[:, window_starts]).sum(axis=0)
+
+    primary_start = outage_start[rows, supplier]
+    primary_end = outage_end[rows, supplier]
+    backup_start = outage_start[rows, backup]
+    backup_end = outage_end[rows, backup]
+
+    results = {}
+    for name, option in options.items():
+        option = {**DEFAULT_OPTION, **option}
+        lead = np.maximum(np.ceil(lead_times * option['lead_time_factor']), 1)
+        primary_lead = lead[rows, supplier]
+        backup_lead = lead[rows, backup]
+        can_reroute = inputs['dual_sourcing_masks'][name][supplier]
+        reorder_point = inputs['reorder_point'] + (option['safety_stock_factor'] - 1) * inputs['safety_stock']
+        ordering_cost = ORDERING_COST * option['ordering_cost_factor']
+
+        on_hand = np.tile(inputs['initial_stock'], (n_scenarios, 1))
+        # Orders due on each day of the horizon; later arrivals only count
+        # towards the inventory position.
+        pipeline = np.zeros((horizon, n_scenarios, n_products))
+        on_order = np.zeros((n_scenarios, n_products))
+        lost = np.zeros((n_scenarios, n_products))
+        cost = np.full(n_scenarios, option['fixed_cost'])
+
+        for t in range(horizon):
+            on_hand += pipeline[t]
+            on_order -= pipeline[t]
+
+            demand = demand_history[:, window_starts + t].T
+            short = np.maximum(demand - on_hand, 0)
+            on_hand -= demand - short
+            lost += short
+
+            # (s, Q) review on the inventory position, which is what the
+            # reorder point is sized for.
+            position = on_hand + on_order
+            trigger = position <= reorder_point
+            if trigger.any():
+                primary_down = (primary_start <= t) & (t < primary_end)
+                backup_down = (backup_start <= t) & (t < backup_end)
+                reroute = trigger & primary_down & can_reroute & ~backup_down
+                # Orders to a supplier that is down wait out the outage.
+                delayed = t + np.where(primary_down, primary_end - t, 0) + primary_lead
+                arrival = np.where(reroute, t + backup_lead, delayed).astype(np.int64)
+                quantity = np.where(trigger, np.maximum(inputs['order_quantity'], reorder_point - position), 0)
+                on_order += quantity
+                due = trigger & (arrival < horizon)
+                pipeline[(arrival[due], *np.nonzero(due))] += quantity[due]
+                cost += trigger.sum(axis=1) * ordering_cost
+                cost += (reroute * quantity * inputs['unit_cost']).sum(axis=1) * option['backup_premium']
+
+            cost += (on_hand * inputs['holding_cost']).sum(axis=1)
+            cost += (short * inputs['stockout_cost']).sum(axis=1)
+
+        results[name] = {
+            'cost': cost,
+            'stockouts': (lost > 0).sum(axis=1),
+            'lost': lost.sum(axis=1),
+            'demand': total_demand
+        }
+    return results
+
+
+class DisruptionSimulator:
+    # Monte Carlo of the supplier portfolio over a planning horizon. Supplier
+    # failures are correlated through shared weather and traffic shocks,
+    # lead times come from SC order history and demand is replayed from
+    # windows of the inventory history. Scenarios run in fixed-size chunks,
+    # each with its own seed, so results don't depend on the worker count.
+    def __init__(self, inputs, horizon=30, n_workers=None, chunk_size=1000, seed=42):
+        self.inputs = {**inputs, 'horizon': min(horizon, inputs['demand'].shape[1])}
+        self.horizon = self.inputs['horizon']
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self.seed = seed
+
+    @classmethod
+    def from_system(cls, risk_assessor, inventory_system, horizon=30, stockout_cost_factor=STOCKOUT_COST_FACTOR, **kwargs):
+        suppliers = risk_assessor.suppliers
+        supplier_ids = suppliers['supplier_id'].to_numpy()
+        lead_time_simulator = risk_assessor.get_lead_time_simulator()
+        columns = lead_time_simulator.columns(supplier_ids)
+
+        store = inventory_system.store
+        product_ids, demand = store.demand_matrix()
+        latest = store.latest_rows(product_ids)
+
+        if 'supplier_id' in store.data.columns:
+            counts = pd.crosstab(store.data['product_id'], store.data['supplier_id'])
+            counts = counts.reindex(index=product_ids, columns=supplier_ids, fill_value=0).to_numpy(dtype=np.float64)
+        else:
+            counts = np.zeros((len(product_ids), len(supplier_ids)))
+        # Products without any known supplier are spread over all of them.
+        counts[counts.sum(axis=1) == 0] = 1
+        shares = counts / counts.sum(axis=1, keepdims=True)
+
+        # Reorder points are sized for the lead times the simulation draws: a
+        # product's lead time is a mixture over its suppliers' SC lead times.
+        lead_time_mean = lead_time_simulator.mean[columns]
+        lead_time_std = lead_time_simulator.std[columns]
+        product_lead_time = shares @ lead_time_mean
+        product_lead_time_var = shares @ (lead_time_std ** 2 + lead_time_mean ** 2) - product_lead_time ** 2
+        policy = inventory_system.optimize_all_stock_levels(
+            lead_times=pd.Series(product_lead_time, index=product_ids),
+            lead_time_stds=pd.Series(np.sqrt(np.maximum(product_lead_time_var, 0)), index=product_ids)
+        ).loc[product_ids]
+
+        reliability = suppliers['reliability_score'].to_numpy(dtype=np.float64)
+        weather_risk = suppliers['weather_risk'].to_numpy(dtype=np.float64)
+        traffic_risk = suppliers['traffic_risk'].to_numpy(dtype=np.float64)
+        # reliability_score is read as the chance of a disruption-free month.
+        failure_probability = np.clip((1 - reliability) * horizon / 30, 0, 0.95)
+        unit_cost = policy['unit_cost'].to_numpy(dtype=np.float64)
+
+        inputs = {
+            'supplier_ids': supplier_ids,
+            'failure_probability': failure_probability,
+            'weather_loading': np.sqrt(WEATHER_CORRELATION * weather_risk),
+            'traffic_loading': np.sqrt(TRAFFIC_CORRELATION * traffic_risk),
+            'outage_days': OUTAGE_DAYS * (1 + weather_risk),
+            'backup': cls.backup_suppliers(failure_probability),
+            'lead_time_mean': lead_time_mean,
+            'lead_time_std': lead_time_std,
+            'distribution': lead_time_simulator.distribution,
+            'product_ids': product_ids,
+            'demand': demand,
+            'supplier_shares': np.cumsum(shares, axis=1),
+            'initial_stock': latest['stock_level'].to_numpy(dtype=np.float64),
+            'reorder_point': policy['reorder_point'].to_numpy(dtype=np.float64),
+            'safety_stock': policy['safety_stock'].to_numpy(dtype=np.float64),
+            'order_quantity': policy['economic_order_quantity'].to_numpy(dtype=np.float64),
+            'unit_cost': unit_cost,
+            'holding_cost': HOLDING_COST_RATE / 365 * unit_cost,
+            'stockout_cost': stockout_cost_factor * unit_cost
+        }
+        return cls(inputs, horizon, **kwargs)
+
+    @staticmethod
+    def backup_suppliers(failure_probability):
+        # Each supplier's backup is the most reliable other supplier.
+        order = np.argsort(failure_probability, kind='stable')
+        backup = np.full(len(failure_probability), order[0])
+        if len(order) > 1:
+            backup[order[0]] = order[1]
+        return backup
+
+    def dual_sourcing_mask(self, dual_sourcing):
+        supplier_ids = self.inputs['supplier_ids']
+        if dual_sourcing is None:
+            return np.zeros(len(supplier_ids), dtype=bool)
+        if isinstance(dual_sourcing, str) and dual_sourcing == 'all':
+            return np.ones(len(supplier_ids), dtype=bool)
+        return np.isin(supplier_ids, list(dual_sourcing))
+
+    def chunks(self, n_scenarios):
+        sizes = [self.chunk_size] * (n_scenarios // self.chunk_size)
+        if n_scenarios % self.chunk_size:
+            sizes.append(n_scenarios % self.chunk_size)
+        return zip(sizes, np.random.SeedSequence(self.seed).spawn(len(sizes)))
+
+    def run(self, options=None, n_scenarios=5000, baseline='baseline'):
+        options = dict(MITIGATION_OPTIONS if options is None else options)
+        options.setdefault(baseline, {})
+        inputs = {
+            **self.inputs,
+            'dual_sourcing_masks': {
+                name: self.dual_sourcing_mask({**DEFAULT_OPTION, **option}['dual_sourcing'])
+                for name, option in options.items()
+            }
+        }
+
+        chunks = list(self.chunks(n_scenarios))
+        n_workers = min(self.n_workers or 1, len(chunks))
+        if n_workers > 1:
+            # spawn keeps the workers free of the parent's thread pools
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=context) as executor:
+                futures = [executor.submit(simulate_chunk, inputs, options, size, seed) for size, seed in chunks]
+                results = [future.result() for future in futures]
+        else:
+            results = [simulate_chunk(inputs, options, size, seed) for size, seed in chunks]
+
+        merged = {
+            name: {key: np.concatenate([result[name][key] for result in results]) for key in results[0][name]}
+            for name in options
+        }
+        return self.summarize(merged, baseline)
+
+    def summarize(self, results, baseline):
+        n_products = len(self.inputs['product_ids'])
+        base = results[baseline]
+        base_stockout = base['stockouts'].sum() / (len(base['stockouts']) * n_products)
+        base_cost = base['cost'].mean()
+
+        rows = {}
+        for name, result in results.items():
+            n_scenarios = len(result['cost'])
+            stockout_probability = result['stockouts'].sum() / (n_scenarios * n_products)
+            cost_delta = result['cost'] - base['cost']
+            rows[name] = {
+                'stockout_probability': stockout_probability,
+                'any_stockout_probability': float(np.mean(result['stockouts'] > 0)),
+                'fill_rate': 1 - result['lost'].sum() / max(result['demand'].sum(), 1e-9),
+                'expected_cost': float(result['cost'].mean()),
+                'cost_p95': float(np.quantile(result['cost'], 0.95)),
+                # Paired against the baseline on the same scenarios.
+                'cost_delta': float(cost_delta.mean()),
+                'cost_delta_se': float(cost_delta.std(ddof=1) / np.sqrt(n_scenarios)) if n_scenarios > 1 else 0.0,
+                'risk_reduction': 1 - stockout_probability / base_stockout if base_stockout > 0 else 0.0,
+                'cost_impact': float(cost_delta.mean() / base_cost) if base_cost else 0.0
+            }
+        return pd.DataFrame.from_dict(rows, orient='index')
@@ -0,0 +1,282 @@
+import os
+import glob
+import pickle
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+NEURALPROPHET_PARAMS = {
+    'growth': "linear",
+    'n_forecasts': 30,
+    'n_lags': 14,
+    'yearly_seasonality': True,
+    'weekly_seasonality': True,
+    'daily_seasonality': False,
+    'batch_size': 32,
+    'epochs': 50,
+    'learning_rate': 1e-3
+}
+
+
+def data_fingerprint(prophet_data):
+    hashed = pd.util.hash_pandas_object(prophet_data[['ds', 'y']], index=False)
+    return hashlib.sha1(hashed.to_numpy().tobytes()).hexdigest()[:16]
+
+
+class ModelRegistry:
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        os.makedirs(model_dir, exist_ok=True)
+
+    def path_for(self, product_id, fingerprint):
+        return os.path.join(self.model_dir, f"product_{int(product_id)}_{fingerprint}.pkl")
+
+    def contains(self, product_id, fingerprint):
+        return os.path.exists(self.path_for(product_id, fingerprint))
+
+    def load(self, product_id, fingerprint):
+        path = self.path_for(product_id, fingerprint)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    def save(self, product_id, fingerprint, model):
+        path = self.path_for(product_id, fingerprint)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(model, file)
+        os.replace(tmp_path, path)
+
+        # Models trained on older data for this product are superseded.
+        for stale in glob.glob(os.path.join(self.model_dir, f"product_{int(product_id)}_*.pkl")):
+            if stale != path:
+                os.remove(stale)
+        return path
+
+    def entries(self):
+        entries = {}
+        for path in glob.glob(os.path.join(self.model_dir, "product_*_*.pkl")):
+            name = os.path.basename(path)[len("product_"):-len(".pkl")]
+            product_id, fingerprint = name.split("_", 1)
+            entries[int(product_id)] = fingerprint
+        return entries
+
+
+def train_product_model(model_dir, product_id, prophet_data, params=None):
+    from neuralprophet import NeuralProphet
+
+    model = NeuralProphet(**{**NEURALPROPHET_PARAMS, **(params or {})})
+    print(f"\nTraining model for product {product_id}...")
+    model.fit(prophet_data, freq='D')
+    fingerprint = data_fingerprint(prophet_data)
+    ModelRegistry(model_dir).save(product_id, fingerprint, model)
+    print(f"Completed training for product {product_id}")
+    return product_id, fingerprint, model
+
+
+class ForecastTrainingPool:
+    def __init__(self, model_dir, max_workers=None, params=None):
+        self.registry = ModelRegistry(model_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.params = params or {}
+
+    def train(self, product_id, prophet_data):
+        return train_product_model(self.registry.model_dir, product_id, prophet_data, self.params)
+
+    def train_many(self, product_frames):
+        # product_frames: {product_id: prophet_data}. Only products whose
+        # current data has no registered model are trained.
+        pending = {
+            product_id: prophet_data
+            for product_id, prophet_data in product_frames.items()
+            if not self.registry.contains(product_id, data_fingerprint(prophet_data))
+        }
+        results = {}
+        if not pending:
+            return results
+
+        if self.max_workers == 1 or len(pending) == 1:
+            for product_id, prophet_data in pending.items():
+                _, fingerprint, model = self.train(product_id, prophet_data)
+                results[product_id] = (fingerprint, model)
+            return results
+
+        # spawn keeps torch's thread pools out of the forked children
+        context = multiprocessing.get_context("spawn")
+        workers = min(self.max_workers, len(pending))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {
+                executor.submit(train_product_model, self.registry.model_dir, product_id, prophet_data, self.params): product_id
+                for product_id, prophet_data in pending.items()
+            }
+            for future in as_completed(futures):
+                product_id = futures[future]
+                try:
+                    _, fingerprint, model = future.result()
+                    results[product_id] = (fingerprint, model)
+                except Exception as e:
+                    print(f"Error training model for product {product_id}: {str(e)}")
+        return results
+
+
+class SeasonalNaiveForecaster:
+    name = 'seasonal_naive'
+
+    def __init__(self, season_length=7, interval=0.95):
+        self.season_length = season_length
+        self.interval = interval
+
+    def forecast(self, series, horizon):
+        from scipy.stats import norm
+
+        series = np.asarray(series, dtype=np.float64)
+        m = min(self.season_length, series.shape[1])
+        steps = np.arange(horizon)
+        mean = series[:, -m:][:, steps % m]
+
+        if series.shape[1] > m:
+            sigma = np.std(series[:, m:] - series[:, :-m], axis=1)
+        else:
+            sigma = np.std(series, axis=1)
+        width = norm.ppf(0.5 + self.interval / 2) * sigma[:, None] * np.sqrt(steps // m + 1)
+        return {
+            'forecast': mean,
+            'lower': np.maximum(mean - width, 0),
+            'upper': mean + width
+        }
+
+
+class HoltWintersForecaster:
+    name = 'holt_winters'
+
+    def __init__(self, alpha=0.3, beta=0.02, gamma=0.1, season_length=7, interval=0.95):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.season_length = season_length
+        self.interval = interval
+
+    def forecast(self, series, horizon):
+        # Additive Holt-Winters run over every product at once: the loop is over
+        # time steps only, each step is a vector update across all rows.
+        from scipy.stats import norm
+
+        series = np.asarray(series, dtype=np.float64)
+        n_series, n_steps = series.shape
+        m = self.season_length if n_steps >= 2 * self.season_length else 1
+        gamma = self.gamma if m > 1 else 0.0
+
+        level = series[:, :m].mean(axis=1)
+        trend = (series[:, m:2 * m].mean(axis=1) - level) / m if n_steps >= 2 * m else np.zeros(n_series)
+        season = series[:, :m] - level[:, None]
+        sq_error = np.zeros(n_series)
+        n_errors = 0
+
+        for t in range(n_steps):
+            y = series[:, t]
+            s = season[:, t % m]
+            if t >= m:
+                sq_error += (y - (level + trend + s)) ** 2
+                n_errors += 1
+            new_level = self.alpha * (y - s) + (1 - self.alpha) * (level + trend)
+            trend = self.beta * (new_level - level) + (1 - self.beta) * trend
+            season[:, t % m] = gamma * (y - new_level) + (1 - gamma) * s
+            level = new_level
+
+        steps = np.arange(1, horizon + 1)
+        mean = level[:, None] + steps * trend[:, None] + season[:, (n_steps - 1 + steps) % m]
+        mean = np.maximum(mean, 0)
+
+        # Interval widens with the horizon as for simple exponential smoothing.
+        sigma = np.sqrt(sq_error / max(n_errors, 1))
+        width = norm.ppf(0.5 + self.interval / 2) * sigma[:, None] * np.sqrt(1 + (steps - 1) * self.alpha ** 2)
+        return {
+            'forecast': mean,
+            'lower': np.maximum(mean - width, 0),
+            'upper': mean + width
+        }
+
+
+def estimate_size(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(v) for v in value)
+    return 64
+
+
+class ForecastCache:
+    # LRU keyed by (product_id, horizon, model_version, data_version); entries
+    # are evicted oldest-first once their estimated size passes max_bytes.
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.product_keys = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            if size > self.max_bytes:
+                return
+            self.entries[key] = value
+            self.sizes[key] = size
+            self.product_keys.setdefault(key[0], set()).add(key)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        self.entries.pop(key)
+        self.total_bytes -= self.sizes.pop(key)
+        keys = self.product_keys.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.product_keys[key[0]]
+
+    def invalidate_product(self, product_id):
+        with self.lock:
+            for key in list(self.product_keys.get(product_id, ())):
+                self.remove(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.product_keys.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
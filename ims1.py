@@ -1,25 +1,160 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from neuralprophet import NeuralProphet
-import pickle
+from statistics import NormalDist
 import warnings
 import traceback
-import random
 import plotly.graph_objs as go
 import plotly
+from inventory_store import InventoryStore, load_inventory_data, read_inventory_csv
+from alerts import AlertEngine, AlertMonitor, format_alert
+from rl_env import InventoryRLAgent
+from forecasting import ForecastCache, ForecastTrainingPool, HoltWintersForecaster, SeasonalNaiveForecaster, data_fingerprint
       
 warnings.filterwarnings('ignore')
 warnings.filterwarnings("ignore", category=UserWarning)
-        
+
+DEFAULT_LEAD_TIME = 7
+DEFAULT_UNIT_COST = 100
+ORDERING_COST = 100
+HOLDING_COST_RATE = 0.2
+
+
+def compute_stock_policy(avg_daily_demand, demand_std, lead_time, unit_cost,
+                         target_service_level=0.95, lead_time_std=0, min_safety_stock=0):
+    # Works elementwise, so the same formulas serve one product or the whole portfolio.
+    z_score = NormalDist().inv_cdf(target_service_level)
+    avg_daily_demand = np.asarray(avg_daily_demand, dtype=np.float64)
+    demand_std = np.nan_to_num(np.asarray(demand_std, dtype=np.float64))
+    lead_time = np.asarray(lead_time, dtype=np.float64)
+    lead_time_std = np.nan_to_num(np.asarray(lead_time_std, dtype=np.float64))
+
+    safety_stock = z_score * np.sqrt(
+        lead_time * demand_std ** 2 + (avg_daily_demand * lead_time_std) ** 2
+    )
+    safety_stock = np.maximum(safety_stock, np.nan_to_num(np.asarray(min_safety_stock, dtype=np.float64)))
+    reorder_point = avg_daily_demand * lead_time + safety_stock
+    annual_demand = avg_daily_demand * 365
+    economic_order_quantity = np.sqrt(
+        (2 * annual_demand * ORDERING_COST) /
+        (HOLDING_COST_RATE * np.asarray(unit_cost, dtype=np.float64))
+    )
+    return {
+        'z_score': float(z_score),
+        'safety_stock': safety_stock,
+        'reorder_point': reorder_point,
+        'economic_order_quantity': economic_order_quantity
+    }
+
+
+def per_product_values(values, product_ids, default):
+    if values is None:
+        return np.full(len(product_ids), default, dtype=np.float64)
+    if np.isscalar(values):
+        return np.full(len(product_ids), values, dtype=np.float64)
+    if isinstance(values, (dict, pd.Series)):
+        mapped = pd.Series(values, dtype=np.float64).reindex(product_ids)
+        return mapped.fillna(default).to_numpy()
+    return np.asarray(values, dtype=np.float64)
+
 class InventoryManagementSystem:
-    def __init__(self, n_products=500, n_days=365):
+    def __init__(self, n_products=500, n_days=365, seed=None, model_dir='models/forecast',
+                 max_workers=None, warm_start=True, default_backend='holt_winters', backend_tiers=None,
+                 forecast_cache_mb=64, alert_rules=None, data_source='synthetic', data_path=None,
+                 cache_dir=None):
         self.n_products = n_products
         self.n_days = n_days
-        self.product_names = self.generate_product_names()
-        self.inventory_data = self.create_synthetic_data()
+        self.start_date = np.datetime64('2022-01-01', 'D')
+        self.rng = np.random.default_rng(seed)
+        if data_source == 'csv':
+            self.store = InventoryStore(self.load_real_data(data_path, cache_dir))
+        else:
+            self.product_names = self.generate_product_names()
+            self.store = InventoryStore(self.create_synthetic_data())
+        self.trainer = ForecastTrainingPool(model_dir, max_workers)
         self.forecast_models = {}
+        self.model_fingerprints = {}
+        self.forecasters = {
+            'holt_winters': HoltWintersForecaster(),
+            'seasonal_naive': SeasonalNaiveForecaster()
+        }
+        self.default_backend = default_backend
+        self.backend_tiers = backend_tiers or {}
+        self.product_backends = {}
+        self.forecast_cache = ForecastCache(int(forecast_cache_mb * 1024 * 1024))
+        self.alert_engine = AlertEngine(alert_rules)
+        self.alert_monitor = AlertMonitor(self.alert_engine)
+        self.alert_monitor.prime(self.store.latest_rows(), self.store.demand_mean)
+        if warm_start:
+            self.load_forecast_models()
+
+    @property
+    def inventory_data(self):
+        return self.store.data
+
+    @inventory_data.setter
+    def inventory_data(self, data):
+        self.store = InventoryStore(data)
+        self.forecast_cache.clear()
+        self.alert_monitor.prime(self.store.latest_rows(), self.store.demand_mean)
+
+    def append_inventory_rows(self, rows):
+        rows = rows.copy()
+        for product_id in rows['product_id'].unique():
+            if int(product_id) not in self.product_names:
+                self.product_names[int(product_id)] = f"Product {product_id}"
+        if 'product_name' not in rows.columns:
+            rows['product_name'] = rows['product_id'].map(self.product_names)
+        touched = self.store.append(rows)
+        for product_id in touched:
+            self.forecast_cache.invalidate_product(int(product_id))
+        self.refresh_alerts(touched)
+        return touched
+
+    def ingest_inventory_csv(self, path, chunksize=100000):
+        summary = {'rows_read': 0, 'rows_appended': 0, 'rows_rejected': 0, 'rows_duplicate': 0}
+        touched = set()
+        for chunk in read_inventory_csv(path, strict=False, chunksize=chunksize):
+            rows, counts = self.store.prepare_rows(chunk)
+            summary['rows_read'] += len(chunk)
+            summary['rows_rejected'] += counts['rejected']
+            summary['rows_duplicate'] += counts['duplicates']
+            if rows.empty:
+                continue
+            touched.update(int(pid) for pid in self.append_inventory_rows(rows))
+            summary['rows_appended'] += len(rows)
+        self.n_products = len(self.store.product_ids)
+        summary['products_touched'] = len(touched)
+        print(f"Ingested {summary['rows_appended']} of {summary['rows_read']} rows from {path}")
+        return summary
+
+    def record_stock_movement(self, product_id, quantity):
+        stock_level = self.store.adjust_stock(product_id, quantity)
+        self.refresh_alerts([product_id])
+        return stock_level
+
+    def refresh_alerts(self, product_ids, now=None):
+        positions = [self.store.positions[int(pid)] for pid in product_ids]
+        return self.alert_monitor.update(
+            self.store.latest_rows(product_ids),
+            self.store.demand_mean[positions],
+            now
+        )
         
+    def load_real_data(self, data_path, cache_dir=None):
+        data = load_inventory_data(data_path, cache_dir)
+        self.n_products = int(data['product_id'].nunique())
+        self.n_days = int(data['date'].nunique())
+        self.start_date = np.datetime64(data['date'].min(), 'D')
+
+        if 'category' in data.columns:
+            categories = data.groupby('product_id', observed=True)['category'].first()
+            self.product_names = {int(pid): f"{category}-{pid}" for pid, category in categories.items()}
+        else:
+            self.product_names = {int(pid): f"Product {pid}" for pid in data['product_id'].unique()}
+        data['product_name'] = data['product_id'].map(self.product_names).astype('category')
+        return data
+
     def generate_product_names(self):
         categories = [  # Pharmaceuticals
                         "Antibiotic", "Painkiller", "Insulin Pen", "Antiviral Drug", "Blood Thinner", 
@@ -75,79 +210,194 @@ class InventoryManagementSystem:
                     ]
         
         
-        product_names = {i: f"{random.choice(categories)}-{i}" for i in range(1, self.n_products + 1)}
+        choices = self.rng.choice(categories, self.n_products)
+        product_names = {i: f"{choices[i - 1]}-{i}" for i in range(1, self.n_products + 1)}
         return product_names    
     
-    def create_synthetic_data(self):
-        start_date = datetime(2022, 1, 1)
-        dates = [start_date + timedelta(days=i) for i in range(self.n_days)]  
-        data = []
-        for product_id in range(1, self.n_products + 1):
-            product_name = self.product_names[product_id]
-            base_demand = np.random.randint(50, 150)  
-            trend = np.random.uniform(-0.2, 0.2)  
-            seasonality = np.random.uniform(10, 30)  
-            noise = np.random.normal(0, 10, self.n_days) 
-            
-            for i, date in enumerate(dates):
-                
-                seasonal_factor = np.sin(2 * np.pi * i / 365) + np.sin(2 * np.pi * i / 30)  
-                demand = max(1, int(base_demand * (1 + trend * i/365) + seasonality * seasonal_factor + noise[i]))
-                min_stock = max(1, int(demand * 0.8))  
-                max_stock = int(demand * 2.5)  
-                stock_level = np.random.randint(min_stock, max_stock)
-                shelf_life = np.random.randint(30, 365)
-                expiry_date = date + timedelta(days=shelf_life)
-                criticality = np.random.randint(1, 6)
-                
-                data.append({
-                    'date': date,
-                    'product_id': product_id,
-                    'product_name': product_name,
-                    'demand': demand,
-                    'stock_level': stock_level,
-                    'shelf_life': shelf_life,
-                    'expiry_date': expiry_date,
-                    'criticality': criticality
-                })
-        
-        return pd.DataFrame(data)
+    def generate_synthetic_arrays(self, product_ids):
+        product_ids = np.asarray(product_ids)
+        n = len(product_ids)
+        days = np.arange(self.n_days)
 
-    def train_forecast_models(self):
-        for product_id in range(1, self.n_products + 1):
-            product_data = self.inventory_data[self.inventory_data['product_id'] == product_id]
-            prophet_data = pd.DataFrame({
-                'ds': product_data['date'],
-                'y': product_data['demand']
-            })
-            model = NeuralProphet(
-                growth="linear",
-                n_forecasts=30,
-                n_lags=14,
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=False,
-                batch_size=32,
-                epochs=50,
-                learning_rate=1e-3
-            )
-            
-            print(f"\nTraining model for product {product_id}...")  
-            metrics = model.fit(prophet_data, freq='D')
-            self.forecast_models[product_id] = model  
-            with open("neuralprophet_model.pkl", "wb") as file:
-                pickle.dump(model, file)
-            print(f"Completed training for product {product_id}")
-        print
-        
-    def forecast_demand(self, product_id, days=30):
-        if product_id not in self.forecast_models:
-                self.train_forecast_models()
-            
-        model = self.forecast_models[product_id]
-        product_data = self.inventory_data[
-            self.inventory_data['product_id'] == product_id
-        ][['date', 'demand']].rename(
+        base_demand = self.rng.integers(50, 150, n)[:, None]
+        trend = self.rng.uniform(-0.2, 0.2, n)[:, None]
+        seasonality = self.rng.uniform(10, 30, n)[:, None]
+        noise = self.rng.normal(0, 10, (n, self.n_days))
+
+        seasonal_factor = np.sin(2 * np.pi * days / 365) + np.sin(2 * np.pi * days / 30)
+        demand = base_demand * (1 + trend * days / 365) + seasonality * seasonal_factor + noise
+        demand = np.maximum(1, demand.astype(np.int64))
+        min_stock = np.maximum(1, (demand * 0.8).astype(np.int64))
+        max_stock = (demand * 2.5).astype(np.int64)
+        stock_level = self.rng.integers(min_stock, max_stock)
+        shelf_life = self.rng.integers(30, 365, (n, self.n_days))
+        criticality = self.rng.integers(1, 6, (n, self.n_days))
+
+        dates = self.start_date + days.astype('timedelta64[D]')
+        expiry_date = dates + shelf_life.astype('timedelta64[D]')
+
+        return {
+            'date': np.tile(dates, n),
+            'product_id': np.repeat(product_ids, self.n_days).astype(np.int32),
+            'demand': demand.ravel().astype(np.int32),
+            'stock_level': stock_level.ravel().astype(np.int32),
+            'shelf_life': shelf_life.ravel().astype(np.int32),
+            'expiry_date': expiry_date.ravel(),
+            'criticality': criticality.ravel().astype(np.int8)
+        }
+
+    def iter_synthetic_data(self, chunk_products=1000):
+        product_ids = np.arange(1, self.n_products + 1)
+        for start in range(0, self.n_products, chunk_products):
+            chunk_ids = product_ids[start:start + chunk_products]
+            arrays = self.generate_synthetic_arrays(chunk_ids)
+            names = np.array([self.product_names[pid] for pid in chunk_ids], dtype=object)
+            arrays['product_name'] = np.repeat(names, self.n_days)
+            yield pd.DataFrame(arrays, columns=[
+                'date', 'product_id', 'product_name', 'demand', 'stock_level',
+                'shelf_life', 'expiry_date', 'criticality'
+            ])
+
+    def create_synthetic_data(self, chunk_products=None):
+        chunk_products = chunk_products or self.n_products
+        chunks = list(self.iter_synthetic_data(chunk_products))
+        if len(chunks) == 1:
+            return chunks[0]
+        return pd.concat(chunks, ignore_index=True)
+
+    def prophet_data(self, product_id):
+        product_data = self.store.rows(product_id)
+        return pd.DataFrame({
+            'ds': product_data['date'].to_numpy(),
+            'y': product_data['demand'].to_numpy()
+        })
+
+    def load_forecast_models(self):
+        registry = self.trainer.registry
+        for product_id, fingerprint in registry.entries().items():
+            if product_id not in self.store:
+                continue
+            if data_fingerprint(self.prophet_data(product_id)) != fingerprint:
+                continue
+            self.forecast_models[product_id] = registry.load(product_id, fingerprint)
+            self.model_fingerprints[product_id] = fingerprint
+        print(f"Loaded {len(self.forecast_models)} forecast models from {registry.model_dir}")
+        return len(self.forecast_models)
+
+    def train_forecast_models(self, product_ids=None):
+        if product_ids is None:
+            product_ids = self.store.product_ids
+        frames = {int(product_id): self.prophet_data(product_id) for product_id in product_ids}
+
+        trained = self.trainer.train_many(frames)
+        for product_id, (fingerprint, model) in trained.items():
+            self.forecast_models[product_id] = model
+            self.model_fingerprints[product_id] = fingerprint
+
+        # Products that already had a registered model for their data were skipped.
+        for product_id, prophet_data in frames.items():
+            fingerprint = data_fingerprint(prophet_data)
+            if self.model_fingerprints.get(product_id) != fingerprint:
+                model = self.trainer.registry.load(product_id, fingerprint)
+                if model is not None:
+                    self.forecast_models[product_id] = model
+                    self.model_fingerprints[product_id] = fingerprint
+        return trained
+
+    def get_forecast_model(self, product_id):
+        prophet_data = self.prophet_data(product_id)
+        fingerprint = data_fingerprint(prophet_data)
+        if self.model_fingerprints.get(product_id) == fingerprint:
+            return self.forecast_models[product_id]
+
+        model = self.trainer.registry.load(product_id, fingerprint)
+        if model is None:
+            _, fingerprint, model = self.trainer.train(product_id, prophet_data)
+        self.forecast_models[product_id] = model
+        self.model_fingerprints[product_id] = fingerprint
+        return model
+
+    def register_forecaster(self, name, forecaster):
+        self.forecasters[name] = forecaster
+
+    def set_forecast_backend(self, product_id, backend):
+        self.product_backends[product_id] = backend
+
+    def forecast_backend_for(self, product_id):
+        if product_id in self.product_backends:
+            return self.product_backends[product_id]
+        criticality = int(self.store.latest(product_id)['criticality'])
+        return self.backend_tiers.get(criticality, self.default_backend)
+
+    def forecast_all(self, days=30, backend=None):
+        forecaster = self.forecasters[backend or self.default_backend]
+        product_ids = self.store.product_ids
+        lengths = self.store.counts
+        result = {key: np.empty((len(product_ids), days)) for key in ['forecast', 'lower', 'upper']}
+        # One batch per history length, so a newly added product with a few rows
+        # doesn't cut every other product's window down to its own.
+        for length in np.unique(lengths):
+            rows = np.flatnonzero(lengths == length)
+            _, series = self.store.demand_matrix(product_ids[rows])
+            batch = forecaster.forecast(series, days)
+            for key in result:
+                result[key][rows] = batch[key]
+        result['product_ids'] = product_ids
+        return result
+
+    def forecast_with_intervals(self, product_id, days=30, backend=None):
+        if product_id not in self.store:
+            raise ValueError(f"No data found for product {product_id}")
+
+        backend = backend or self.forecast_backend_for(product_id)
+        _, series = self.store.demand_matrix([product_id])
+        if backend == 'neuralprophet':
+            # NeuralProphet gives point forecasts only, so the interval width comes
+            # from the statistical baseline fitted to the same history.
+            baseline = self.forecasters[self.default_backend].forecast(series, days)
+            forecast = np.asarray(self.neuralprophet_forecast(product_id, days), dtype=np.float64)
+            half_width = (baseline['upper'][0] - baseline['lower'][0])[:len(forecast)] / 2
+            lower = np.maximum(forecast - half_width, 0)
+            upper = forecast + half_width
+        else:
+            result = self.forecasters[backend].forecast(series, days)
+            forecast, lower, upper = result['forecast'][0], result['lower'][0], result['upper'][0]
+
+        return {
+            'forecast': forecast,
+            'lower': lower,
+            'upper': upper,
+            'backend': backend
+        }
+
+    def model_version(self, product_id, backend):
+        if backend == 'neuralprophet':
+            return f"neuralprophet:{self.model_fingerprints.get(product_id, 'untrained')}"
+        return backend
+
+    def forecast_with_chart(self, product_id, days=30, backend=None):
+        if product_id not in self.store:
+            raise ValueError(f"No data found for product {product_id}")
+
+        backend = backend or self.forecast_backend_for(product_id)
+        key = (product_id, days, self.model_version(product_id, backend), self.store.data_version(product_id))
+        cached = self.forecast_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self.forecast_with_intervals(product_id, days, backend)
+        result['chart'] = self.visualize_forecast(product_id, result['forecast'], result['lower'], result['upper'])
+        # Training on a miss changes the model version, so key on the post-forecast one.
+        key = (product_id, days, self.model_version(product_id, backend), self.store.data_version(product_id))
+        self.forecast_cache.put(key, result)
+        return result
+
+    def forecast_demand(self, product_id, days=30, backend=None):
+        return self.forecast_with_intervals(product_id, days, backend)['forecast']
+
+    def neuralprophet_forecast(self, product_id, days=30):
+        model = self.get_forecast_model(product_id)
+        product_data = self.store.rows(product_id)[['date', 'demand']].rename(
             columns={'date': 'ds', 'demand': 'y'}
         )
     
@@ -177,73 +427,94 @@ class InventoryManagementSystem:
         
     def optimize_stock_levels(self, product_id, target_service_level=0.95):
      
-        product_data = self.inventory_data[self.inventory_data['product_id'] == product_id]   
-        if product_data.empty:
+        stats = self.store.stats(product_id, include_std=True)
+        if stats is None:
             raise ValueError(f"No data found for product {product_id}")
 
-        avg_daily_demand = product_data['demand'].mean()
-        demand_std = product_data['demand'].std()
-        lead_time = 7  
-        z_score = 1.645 
-        ordering_cost = 100  
-        holding_cost_rate = 0.2 
-        safety_stock = z_score * demand_std * np.sqrt(lead_time)  
-        reorder_point = (avg_daily_demand * lead_time) + safety_stock
-        annual_demand = avg_daily_demand * 365
-        avg_unit_cost = 100 
-        economic_order_quantity = np.sqrt(
-            (2 * annual_demand * ordering_cost) / 
-            (holding_cost_rate * avg_unit_cost)
+        avg_daily_demand = stats['demand_mean']
+        demand_std = stats['demand_std']
+        product_data = self.store.rows(product_id)
+        lead_time, lead_time_std = DEFAULT_LEAD_TIME, 0
+        if 'lead_time' in product_data.columns:
+            lead_time = product_data['lead_time'].mean()
+            lead_time_std = product_data['lead_time'].std()
+        unit_cost = product_data['unit_cost'].mean() if 'unit_cost' in product_data.columns else DEFAULT_UNIT_COST
+        min_safety_stock = product_data['safety_stock'].iloc[-1] if 'safety_stock' in product_data.columns else 0
+
+        policy = compute_stock_policy(
+            avg_daily_demand, demand_std, lead_time, unit_cost,
+            target_service_level, lead_time_std, min_safety_stock
         )
 
         return {
             'product_id': product_id,
             'product_name': self.product_names[product_id],
-            'reorder_point': float(reorder_point),
-            'economic_order_quantity': float(economic_order_quantity),
-            'safety_stock': float(safety_stock),
+            'reorder_point': float(policy['reorder_point']),
+            'economic_order_quantity': float(policy['economic_order_quantity']),
+            'safety_stock': float(policy['safety_stock']),
             'avg_daily_demand': float(avg_daily_demand),
             'demand_std': float(demand_std)
         }
 
-    def generate_alerts(self):
-    
-        current_date = datetime.now()
-        alerts = []
-        
-        for product_id in range(1, self.n_products + 1):
-            product_data = self.inventory_data[self.inventory_data['product_id'] == product_id]
-            
-            if product_data.empty:
-                continue
-                
-            latest_data = product_data.iloc[-1]  
-            avg_demand = product_data['demand'].mean()
-            stock_days = latest_data['stock_level'] / avg_demand if avg_demand > 0 else float('inf')  
-            if stock_days < 7: 
-                alerts.append(
-                    f"Low stock alert: {latest_data['product_name']} (ID: {product_id}) - "
-                    f"Current stock: {int(latest_data['stock_level'])} "
-                    f"({avg_demand:.1f}/day, {stock_days:.1f} days remaining)"
-                )   
-            if current_date + timedelta(days=30) > latest_data['expiry_date']:
-                days_to_expiry = (latest_data['expiry_date'] - current_date).days
-                if days_to_expiry > 0:  
-                    alerts.append(
-                        f"Expiry alert: Product {product_id} - "
-                        f"Expires in {days_to_expiry} days"
-                    )       
-            if latest_data['criticality'] >= 4 and stock_days < 14: 
-                alerts.append(
-                    f"Critical item alert: Product {product_id} - "
-                    f"High criticality item running low"
-                )
-
-        return alerts
-    
-    def visualize_forecast(self, product_id, forecast):
+    def optimize_all_stock_levels(self, target_service_level=0.95, lead_times=None, unit_costs=None,
+                                  lead_time_stds=None):
+        store = self.store
+        columns = store.data.columns
+        product_ids = store.product_ids
+
+        if lead_times is not None:
+            lead_time = per_product_values(lead_times, product_ids, DEFAULT_LEAD_TIME)
+            lead_time_std = per_product_values(lead_time_stds, product_ids, 0)
+        elif 'lead_time' in columns:
+            lead_time = store.column_means('lead_time')
+            lead_time_std = store.column_stds('lead_time')
+        else:
+            lead_time = np.full(len(product_ids), DEFAULT_LEAD_TIME, dtype=np.float64)
+            lead_time_std = 0
+
+        if unit_costs is not None:
+            unit_cost = per_product_values(unit_costs, product_ids, DEFAULT_UNIT_COST)
+        elif 'unit_cost' in columns:
+            unit_cost = store.column_means('unit_cost')
+        else:
+            unit_cost = np.full(len(product_ids), DEFAULT_UNIT_COST, dtype=np.float64)
+
+        min_safety_stock = 0
+        if 'safety_stock' in columns:
+            min_safety_stock = store.data['safety_stock'].to_numpy()[store.stops - 1]
+
+        demand_std = store.demand_std
+        policy = compute_stock_policy(
+            store.demand_mean, demand_std, lead_time, unit_cost,
+            target_service_level, lead_time_std, min_safety_stock
+        )
+
+        return pd.DataFrame({
+            'product_name': [self.product_names.get(int(pid), f"Product {pid}") for pid in product_ids],
+            'reorder_point': policy['reorder_point'],
+            'economic_order_quantity': policy['economic_order_quantity'],
+            'safety_stock': policy['safety_stock'],
+            'avg_daily_demand': store.demand_mean,
+            'demand_std': demand_std,
+            'lead_time': lead_time,
+            'unit_cost': unit_cost
+        }, index=pd.Index(product_ids, name='product_id'))
+
+    def evaluate_alerts(self, now=None):
+        return self.alert_engine.evaluate(self.store.latest_rows(), self.store.demand_mean, now)
+
+    def get_alerts(self, page=1, page_size=50, alert_type=None, min_severity=None, sort_by=None, now=None):
+        return self.alert_engine.page(self.evaluate_alerts(now), page, page_size, alert_type, min_severity, sort_by)
+
+    def generate_alerts(self, limit=None, now=None):
+        alerts = self.evaluate_alerts(now)
+        if limit is not None:
+            alerts = alerts.iloc[:limit]
+        return [format_alert(alert) for alert in alerts.to_dict('records')]
+
+    def visualize_forecast(self, product_id, forecast, lower=None, upper=None):
         try:
-            actual_data = self.inventory_data[self.inventory_data['product_id'] == product_id]
+            actual_data = self.store.rows(product_id)
             
             if actual_data.empty:
                 print(f"No actual data found for product_id {product_id}")
@@ -268,8 +539,14 @@ class InventoryManagementSystem:
             )
             
             forecast_values = forecast.tolist() if hasattr(forecast, 'tolist') else list(forecast)
-            lower_bound = [max(0, value * 0.8) for value in forecast_values]
-            upper_bound = [value * 1.2 for value in forecast_values]
+            if lower is not None and upper is not None:
+                lower_bound = [max(0, float(value)) for value in lower]
+                upper_bound = [float(value) for value in upper]
+                interval_name = "95% Prediction Interval"
+            else:
+                lower_bound = [max(0, value * 0.8) for value in forecast_values]
+                upper_bound = [value * 1.2 for value in forecast_values]
+                interval_name = "80-120% Confidence"
             
             ci_trace = go.Scatter(
                 x=forecast_dates + forecast_dates[::-1],
@@ -278,7 +555,7 @@ class InventoryManagementSystem:
                 fillcolor='rgba(231,107,243,0.2)',
                 line=dict(color='rgba(255,255,255,0)'),
                 showlegend=False,
-                name="80-120% Confidence"
+                name=interval_name
             )
             
             data = [actual_trace, ci_trace, forecast_trace]
@@ -301,24 +578,19 @@ class InventoryManagementSystem:
             
     def get_inventory_status(self):
  
-        current_date = max(self.inventory_data['date'])
-        latest_data = self.inventory_data[self.inventory_data['date'] == current_date]
-        
+        latest_data = self.store.latest_rows()
+        latest_data = latest_data[latest_data['date'] == latest_data['date'].max()]
+
+        policy = self.optimize_all_stock_levels()
+
         inventory_status = {}
         for _, row in latest_data.iterrows():
             product_id = row['product_id']
-        
-            product_data = self.inventory_data[self.inventory_data['product_id'] == product_id]
-            avg_demand = product_data['demand'].mean()
-        
+            avg_demand = policy.at[product_id, 'avg_daily_demand']
+            reorder_point = float(policy.at[product_id, 'reorder_point'])
+
             days_remaining = float('inf') if avg_demand == 0 else row['stock_level'] / avg_demand
-            
-            try:
-                optimization = self.optimize_stock_levels(product_id)
-                reorder_point = optimization['reorder_point']
-            except:
-                reorder_point = avg_demand * 7 
-            
+
             inventory_status[self.product_names[product_id]] = {
                 'product_name': row['product_name'],
                 'stock_level': row['stock_level'],
@@ -391,86 +663,31 @@ class InventoryManagementSystem:
         
         return route_data
     
-class InventoryRLAgent:
-        def __init__(self, n_products, n_states=10, n_actions=10):
-            self.n_products = n_products
-            self.n_states = n_states
-            self.n_actions = n_actions
-            self.q_table = np.zeros((n_products, n_states, n_actions))
-            self.learning_rate = 0.1
-            self.discount_factor = 0.95
-            self.epsilon = 0.1
-            
-            self.action_meanings = {
-            0: "No order needed",
-            1: "Order small quantity (25% of max)",
-            2: "Order medium quantity (50% of max)",
-            3: "Order large quantity (75% of max)",
-            4: "Order maximum quantity"
-        }
+if __name__ == '__main__':
+    ims = InventoryManagementSystem(n_products=10, n_days=365)
+    first_day_data = ims.inventory_data[ims.inventory_data['date'] == '2022-01-01']
+    print(first_day_data.head(10)) 
+    rl_agent = InventoryRLAgent(n_products=10)
 
-        def get_state_index(self, stock_level, max_stock=1000):
-            state_size = max_stock / self.n_states
-            return min(int(stock_level / state_size), self.n_states - 1)
+    ims.train_forecast_models()
 
-        def get_action(self, product_id, stock_level):
-           
-            state = self.get_state_index(stock_level)
-                   
-            if np.random.random() < self.epsilon:
-                action_idx = np.random.randint(0, self.n_actions)
-            else:
-                action_idx = np.argmax(self.q_table[product_id-1, state])
-    
-            max_order = 1000
-            order_quantity = 0
-            if action_idx > 0:
-                order_quantity = (action_idx * 0.25) * max_order
-                
-            return {
-                'action_idx': action_idx, 
-                'action_meaning': self.action_meanings[action_idx],
-                'order_quantity': int(order_quantity)
-            }
+    product_id = 1
+    forecast = ims.forecast_demand(product_id)
 
-        def update_q_table(self, product_id, stock_level, action_info, reward, next_stock_level):
-            state = self.get_state_index(stock_level)
-            next_state = self.get_state_index(next_stock_level)
-            action_idx = action_info['action_idx']
-            old_value = self.q_table[product_id-1, state, action_idx]
-            next_max = np.max(self.q_table[product_id-1, next_state])
-            new_value = (1 - self.learning_rate) * old_value + \
-                        self.learning_rate * (reward + self.discount_factor * next_max)
-            
-            self.q_table[product_id-1, state, action_idx] = new_value
-            
-            return new_value
-
-ims = InventoryManagementSystem(n_products=10, n_days=365)
-first_day_data = ims.inventory_data[ims.inventory_data['date'] == '2022-01-01']
-print(first_day_data.head(10)) 
-rl_agent = InventoryRLAgent(n_products=10)
-
-ims.train_forecast_models()
+    optimization_result = ims.optimize_stock_levels(product_id)
+    print("\nStock level optimization result:")
+    print(optimization_result)
 
-product_id = 1
-forecast = ims.forecast_demand(product_id)
-
-optimization_result = ims.optimize_stock_levels(product_id)
-print("\nStock level optimization result:")
-print(optimization_result)
-
-alerts = ims.generate_alerts()
-print("\nAlerts:")
-for alert in alerts[:5]:  
-    print(alert)
-    
-product_id = 1
-current_stock = 5
-action_info = rl_agent.get_action(product_id, current_stock)
-print(f"\nRL Agent recommended action for product {product_id} with stock level {current_stock}: {action_info}")
+    alerts = ims.generate_alerts()
+    print("\nAlerts:")
+    for alert in alerts[:5]:  
+        print(alert)
 
-reward = 1  
-next_stock = 6  
-rl_agent.update_q_table(product_id, current_stock, action_info, reward, next_stock)
+    product_id = 1
+    current_stock = 5
+    action_info = rl_agent.get_action(product_id, current_stock)
+    print(f"\nRL Agent recommended action for product {product_id} with stock level {current_stock}: {action_info}")
 
+    reward = 1  
+    next_stock = 6  
+    rl_agent.update_q_table(product_id, current_stock, action_info, reward, next_stock)
@@ -0,0 +1,418 @@
+import os
+import numpy as np
+import pandas as pd
+
+INVENTORY_DTYPES = {
+    'product_id': 'int32',
+    'category': 'category',
+    'demand': 'float32',
+    'stock_level': 'float32',
+    'safety_stock': 'float32',
+    'reorder_point': 'float32',
+    'lead_time': 'float32',
+    'criticality': 'int8',
+    'unit_cost': 'float32',
+    'supplier_id': 'int32',
+    'batch_number': 'string',
+    'storage_temp': 'category'
+}
+INVENTORY_DATE_COLUMNS = ['date', 'expiry_date']
+REQUIRED_COLUMNS = ['date', 'product_id', 'demand', 'stock_level']
+DEDUP_COLUMNS = ['date', 'product_id', 'batch_number']
+
+
+def row_keys(rows):
+    # 64-bit hashes of the dedupe key, normalised so that date units and
+    # categorical vs string batch numbers hash the same way.
+    key = pd.DataFrame({
+        'date': rows['date'].to_numpy().astype('datetime64[D]').astype(np.int64),
+        'product_id': rows['product_id'].to_numpy().astype(np.int64)
+    })
+    if 'batch_number' in rows.columns:
+        key['batch_number'] = rows['batch_number'].astype(str).to_numpy()
+    return pd.util.hash_pandas_object(key, index=False).to_numpy()
+
+
+def sorted_contains(sorted_values, values):
+    if len(sorted_values) == 0:
+        return np.zeros(len(values), dtype=bool)
+    index = np.minimum(np.searchsorted(sorted_values, values), len(sorted_values) - 1)
+    return sorted_values[index] == values
+
+
+def validate_inventory_rows(rows):
+    missing = [col for col in REQUIRED_COLUMNS if col not in rows.columns]
+    if missing:
+        raise ValueError(f"Inventory rows missing required columns: {', '.join(missing)}")
+    # Unparseable cells become NaN/NaT and fail the notna check below, so a bad
+    # row is rejected on its own instead of failing the whole chunk.
+    coerced = {
+        col: pd.to_numeric(rows[col], errors='coerce')
+        for col in ['product_id', 'demand', 'stock_level']
+        if not pd.api.types.is_numeric_dtype(rows[col])
+    }
+    if not pd.api.types.is_datetime64_any_dtype(rows['date']):
+        coerced['date'] = pd.to_datetime(rows['date'], errors='coerce')
+    if coerced:
+        rows = rows.assign(**coerced)
+    valid = rows[REQUIRED_COLUMNS].notna().all(axis=1)
+    valid &= (rows['demand'] >= 0) & (rows['stock_level'] >= 0)
+    valid &= rows['product_id'] == rows['product_id'].round()
+    rows = rows[valid]
+    if rows['product_id'].dtype != INVENTORY_DTYPES['product_id']:
+        rows = rows.astype({'product_id': INVENTORY_DTYPES['product_id']})
+    return rows, int((~valid).sum())
+
+
+def read_inventory_csv(path, strict=True, **kwargs):
+    # Non-strict reads leave numeric columns to inference (nulls come back as
+    # float, garbage as object) so rows can be validated before the cast.
+    header = pd.read_csv(path, nrows=0).columns
+    dtype = {col: dtype for col, dtype in INVENTORY_DTYPES.items() if col in header}
+    if not strict:
+        dtype = {col: d for col, d in dtype.items() if d in ('category', 'string')}
+    return pd.read_csv(
+        path,
+        dtype=dtype,
+        parse_dates=[col for col in INVENTORY_DATE_COLUMNS if col in header],
+        **kwargs
+    )
+
+
+def load_inventory_data(path, cache_dir=None):
+    # The first load parses the CSV and writes an uncompressed Feather copy to
+    # cache_dir; later loads read that copy, dtypes included, instead of
+    # re-parsing as long as the CSV is unchanged.
+    if cache_dir is None:
+        return read_inventory_csv(path)
+
+    try:
+        from pyarrow import feather
+    except ImportError:
+        print("pyarrow not installed, reading inventory CSV without a cache")
+        return read_inventory_csv(path)
+
+    stat = os.stat(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, f"{stem}.{stat.st_size}.{stat.st_mtime_ns}.feather")
+    if os.path.exists(cache_path):
+        return feather.read_feather(cache_path)
+
+    data = read_inventory_csv(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    for stale in os.listdir(cache_dir):
+        if stale.startswith(f"{stem}.") and stale.endswith(".feather"):
+            os.remove(os.path.join(cache_dir, stale))
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    feather.write_feather(data, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, cache_path)
+    return data
+
+
+class InventoryStore:
+    # Appended rows are kept in a list of pending chunks and only merged into
+    # the sorted frame once they reach compact_ratio of its size (or
+    # max_pending chunks), so appends cost O(rows) amortised instead of a full
+    # copy each. tail_chunk/tail_offset point at each product's latest row,
+    # which lives in a pending chunk (tail_chunk >= 0) or the frame (-1).
+    def __init__(self, data, compact_ratio=0.25, max_pending=64):
+        self.version_counter = 0
+        self.compact_ratio = compact_ratio
+        self.max_pending = max_pending
+        self.build(data)
+
+    def build(self, data):
+        # Sorted dedupe hashes of the frame, built on first use; hashes of
+        # appended rows wait in pending_keys until the next compact().
+        self.key_hashes = None
+        self.pending_keys = set()
+        self.frame = data.sort_values(['product_id', 'date'], kind='mergesort').reset_index(drop=True)
+        self.pending = []
+        self.pending_rows = 0
+
+        product_col = self.frame['product_id'].to_numpy()
+        self.product_ids, starts, counts = np.unique(product_col, return_index=True, return_counts=True)
+        self.starts = starts.astype(np.int64)
+        self.stops = self.starts + counts
+        self.positions = {int(pid): i for i, pid in enumerate(self.product_ids)}
+        self.version_counter += 1
+        self.versions = np.full(len(self.product_ids), self.version_counter, dtype=np.int64)
+        self.tail_chunk = np.full(len(self.product_ids), -1, dtype=np.int64)
+        self.tail_offset = np.zeros(len(self.product_ids), dtype=np.int64)
+        self.latest_dates = self.frame['date'].to_numpy()[self.stops - 1]
+
+        # Per-product demand aggregates kept as (count, mean, M2) so appends can be
+        # merged in with Chan's parallel variance update instead of a rescan.
+        demand = self.frame['demand'].to_numpy(dtype=np.float64)
+        self.counts = counts.astype(np.int64)
+        if len(demand):
+            self.demand_mean = np.add.reduceat(demand, self.starts) / self.counts
+            deviation = demand - np.repeat(self.demand_mean, self.counts)
+            self.demand_m2 = np.add.reduceat(deviation ** 2, self.starts)
+        else:
+            self.demand_mean = np.zeros(0)
+            self.demand_m2 = np.zeros(0)
+
+    @property
+    def data(self):
+        self.compact()
+        return self.frame
+
+    def __len__(self):
+        return len(self.frame) + self.pending_rows
+
+    def __contains__(self, product_id):
+        return int(product_id) in self.positions
+
+    def product_slice(self, product_id):
+        self.compact()
+        pos = self.positions.get(int(product_id))
+        if pos is None:
+            return None
+        return int(self.starts[pos]), int(self.stops[pos])
+
+    def rows(self, product_id):
+        bounds = self.product_slice(product_id)
+        if bounds is None:
+            return self.data.iloc[0:0]
+        return self.data.iloc[bounds[0]:bounds[1]]
+
+    def data_version(self, product_id):
+        pos = self.positions.get(int(product_id))
+        return None if pos is None else int(self.versions[pos])
+
+    def latest_location(self, pos):
+        chunk = self.tail_chunk[pos]
+        if chunk < 0:
+            return self.frame, int(self.stops[pos] - 1)
+        return self.pending[chunk], int(self.tail_offset[pos])
+
+    def latest(self, product_id):
+        pos = self.positions.get(int(product_id))
+        if pos is None:
+            return None
+        frame, row = self.latest_location(pos)
+        return frame.iloc[row]
+
+    def latest_rows(self, product_ids=None):
+        if product_ids is None:
+            positions = np.arange(len(self.product_ids))
+        else:
+            positions = np.array([self.positions[int(pid)] for pid in product_ids], dtype=np.int64)
+        chunks = self.tail_chunk[positions]
+        if (chunks < 0).all():
+            return self.frame.iloc[self.stops[positions] - 1]
+
+        pieces, order = [], []
+        for chunk in np.unique(chunks):
+            at = np.flatnonzero(chunks == chunk)
+            if chunk < 0:
+                pieces.append(self.frame.iloc[self.stops[positions[at]] - 1])
+            else:
+                pieces.append(self.pending[chunk].iloc[self.tail_offset[positions[at]]])
+            order.append(at)
+        rows = pd.concat(pieces, ignore_index=True)
+        return rows.take(np.argsort(np.concatenate(order))).reset_index(drop=True)
+
+    def adjust_stock(self, product_id, quantity):
+        pos = self.positions.get(int(product_id))
+        if pos is None:
+            raise KeyError(f"No data found for product {product_id}")
+        frame, row = self.latest_location(pos)
+        column = frame.columns.get_loc('stock_level')
+        stock_level = frame.iat[row, column] + quantity
+        # Same rule as validate_inventory_rows: stock can't go below zero.
+        if not np.isfinite(quantity) or stock_level < 0:
+            raise ValueError(
+                f"Movement of {quantity} would leave product {product_id} at negative stock ({stock_level})"
+            )
+        if np.issubdtype(frame['stock_level'].dtype, np.integer):
+            stock_level = int(round(stock_level))
+        frame.iat[row, column] = stock_level
+        return stock_level
+
+    @property
+    def demand_std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = np.where(self.counts > 1, self.demand_m2 / (self.counts - 1), np.nan)
+        return np.sqrt(variance)
+
+    def stats(self, product_id, include_std=False):
+        # O(1): reads the per-product aggregates; the variance is only derived
+        # for this product, and only when asked for.
+        pos = self.positions.get(int(product_id))
+        if pos is None:
+            return None
+        n = int(self.counts[pos])
+        stats = {'n': n, 'demand_mean': float(self.demand_mean[pos])}
+        if include_std:
+            stats['demand_std'] = float(np.sqrt(self.demand_m2[pos] / (n - 1))) if n > 1 else float('nan')
+        return stats
+
+    def column_means(self, column):
+        values = self.data[column].to_numpy(dtype=np.float64)
+        return np.add.reduceat(values, self.starts) / self.counts
+
+    def column_stds(self, column):
+        values = self.data[column].to_numpy(dtype=np.float64)
+        means = np.add.reduceat(values, self.starts) / self.counts
+        deviation = values - np.repeat(means, self.counts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = np.where(
+                self.counts > 1,
+                np.add.reduceat(deviation ** 2, self.starts) / (self.counts - 1),
+                np.nan
+            )
+        return np.sqrt(variance)
+
+    def demand_matrix(self, product_ids=None, window=None):
+        # Right-aligned (products x window) view of the most recent demand; the
+        # window defaults to the shortest history so every row is fully populated.
+        if product_ids is None:
+            positions = np.arange(len(self.product_ids))
+        else:
+            positions = np.array([self.positions[int(pid)] for pid in product_ids], dtype=np.int64)
+        shortest = int(self.counts[positions].min()) if len(positions) else 0
+        window = shortest if window is None else min(window, shortest)
+
+        demand = self.data['demand'].to_numpy(dtype=np.float64)
+        index = self.stops[positions][:, None] - window + np.arange(window)
+        return self.product_ids[positions], demand[index]
+
+    def aggregates(self):
+        self.compact()
+        return pd.DataFrame({
+            'n': self.counts,
+            'demand_mean': self.demand_mean,
+            'demand_std': self.demand_std,
+            'latest_row': self.stops - 1
+        }, index=pd.Index(self.product_ids, name='product_id'))
+
+    def coerce_rows(self, rows):
+        rows = rows.copy()
+        for col in rows.columns.intersection(self.frame.columns):
+            dtype = self.frame[col].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                categories = dtype.categories.union(pd.Index(rows[col].dropna().unique()))
+                if len(categories) > len(dtype.categories):
+                    # Pending chunks share the frame's categories so they concat cleanly.
+                    for frame in [self.frame] + self.pending:
+                        frame[col] = frame[col].cat.set_categories(categories)
+                rows[col] = pd.Categorical(rows[col], categories=categories)
+            elif rows[col].dtype != dtype:
+                try:
+                    rows[col] = rows[col].astype(dtype)
+                except (TypeError, ValueError):
+                    pass
+        return rows
+
+    def drop_duplicates(self, rows):
+        keys = row_keys(rows)
+        first = ~pd.Series(keys).duplicated().to_numpy()
+        if self.key_hashes is None:
+            self.key_hashes = np.unique(row_keys(self.data))
+        seen = sorted_contains(self.key_hashes, keys)
+        if self.pending_keys:
+            seen |= np.fromiter((key in self.pending_keys for key in keys.tolist()), dtype=bool, count=len(keys))
+        fresh = first & ~seen
+        return rows[fresh], int((~fresh).sum())
+
+    def prepare_rows(self, rows):
+        rows, rejected = validate_inventory_rows(rows)
+        rows, duplicates = self.drop_duplicates(rows)
+        return rows, {'rejected': rejected, 'duplicates': duplicates}
+
+    def merge_keys(self):
+        # Both sides are sorted, so new hashes are inserted in one pass rather
+        # than re-sorting the whole index.
+        if not self.pending_keys:
+            return
+        keys = np.fromiter(self.pending_keys, dtype=self.key_hashes.dtype, count=len(self.pending_keys))
+        keys = np.sort(keys[~sorted_contains(self.key_hashes, keys)])
+        self.key_hashes = np.insert(self.key_hashes, np.searchsorted(self.key_hashes, keys), keys)
+        self.pending_keys = set()
+
+    def compact(self):
+        self.merge_keys()
+        if not self.pending:
+            return
+        rows = pd.concat(self.pending, ignore_index=True)
+        pos = np.searchsorted(self.product_ids, rows['product_id'].to_numpy())
+        by_product = np.argsort(pos, kind='stable')
+        rows, pos = rows.take(by_product), pos[by_product]
+
+        n_products = len(self.product_ids)
+        n_old = len(self.frame)
+        added = np.bincount(pos, minlength=n_products)
+        shift = np.cumsum(added) - added
+        old_counts = self.stops - self.starts
+
+        # Place every old row after the new rows of all preceding products and
+        # every new row at the tail of its own product's block.
+        old_target = np.arange(n_old) + np.repeat(shift, old_counts)
+        rank = np.arange(len(rows)) - shift[pos]
+        new_starts = self.starts + shift
+        new_target = new_starts[pos] + old_counts[pos] + rank
+
+        order = np.empty(n_old + len(rows), dtype=np.int64)
+        order[old_target] = np.arange(n_old)
+        order[new_target] = n_old + np.arange(len(rows))
+        combined = pd.concat([self.frame, rows], ignore_index=True)
+        self.frame = combined.take(order).reset_index(drop=True)
+        self.starts = new_starts
+        self.stops = new_starts + old_counts + added
+        self.pending = []
+        self.pending_rows = 0
+        self.tail_chunk[:] = -1
+
+    def append(self, rows):
+        if rows.empty:
+            return np.array([], dtype=self.product_ids.dtype)
+
+        rows = self.coerce_rows(rows).sort_values(['product_id', 'date'], kind='mergesort')
+        if self.key_hashes is not None:
+            self.pending_keys.update(row_keys(rows).tolist())
+        new_pids = rows['product_id'].to_numpy()
+        touched = np.unique(new_pids)
+
+        # Unknown products or back-dated rows can't be slotted onto the end of
+        # an existing block, so fall back to a full re-index.
+        if not np.isin(touched, self.product_ids).all():
+            self.build(pd.concat([self.data, rows], ignore_index=True))
+            return touched
+        pos = np.searchsorted(self.product_ids, new_pids)
+        dates = rows['date'].to_numpy()
+        if (dates < self.latest_dates[pos]).any():
+            self.build(pd.concat([self.data, rows], ignore_index=True))
+            return touched
+
+        n_products = len(self.product_ids)
+        added = np.bincount(pos, minlength=n_products)
+        last = np.flatnonzero(np.append(new_pids[1:] != new_pids[:-1], True))
+        self.pending.append(rows.reset_index(drop=True))
+        self.pending_rows += len(rows)
+        self.tail_chunk[pos[last]] = len(self.pending) - 1
+        self.tail_offset[pos[last]] = last
+        self.latest_dates[pos[last]] = dates[last]
+
+        demand = rows['demand'].to_numpy(dtype=np.float64)
+        batch_mean = np.zeros(n_products)
+        hit = added > 0
+        batch_mean[hit] = np.bincount(pos, weights=demand, minlength=n_products)[hit] / added[hit]
+        batch_m2 = np.bincount(pos, weights=(demand - batch_mean[pos]) ** 2, minlength=n_products)
+
+        total = self.counts + added
+        delta = batch_mean - self.demand_mean
+        self.demand_mean = np.where(hit, self.demand_mean + delta * added / np.maximum(total, 1), self.demand_mean)
+        self.demand_m2 = np.where(
+            hit,
+            self.demand_m2 + batch_m2 + delta ** 2 * self.counts * added / np.maximum(total, 1),
+            self.demand_m2
+        )
+        self.counts = total
+        self.version_counter += 1
+        self.versions[hit] = self.version_counter
+
+        if self.pending_rows >= self.compact_ratio * len(self.frame) or len(self.pending) >= self.max_pending:
+            self.compact()
+        return touched
@@ -0,0 +1,128 @@
+import numpy as np
+
+LEAD_TIME_DISTRIBUTIONS = ['normal', 'truncnorm', 'lognormal']
+
+
+def summarize_lead_times(samples, quantiles=(0.025, 0.5, 0.975), bins=50):
+    # samples is (n_simulations x n_suppliers); every statistic is computed
+    # column-wise, including one histogram per supplier over its own range.
+    n_suppliers = samples.shape[1]
+    low = samples.min(axis=0)
+    high = samples.max(axis=0)
+    width = np.where(high > low, (high - low) / bins, 1.0)
+
+    bin_index = np.minimum(((samples - low) / width).astype(np.int64), bins - 1)
+    bin_index += np.arange(n_suppliers) * bins
+    counts = np.bincount(bin_index.ravel(), minlength=n_suppliers * bins).reshape(n_suppliers, bins)
+
+    return {
+        'mean': samples.mean(axis=0),
+        'std': samples.std(axis=0),
+        'quantile_levels': np.asarray(quantiles, dtype=np.float64),
+        'quantiles': np.quantile(samples, quantiles, axis=0),
+        'counts': counts,
+        'bin_edges': low[:, None] + width[:, None] * np.arange(bins + 1)
+    }
+
+
+def lead_time_chart(supplier_id, counts, bin_edges, mean_lead_time):
+    import plotly.graph_objs as go
+
+    bin_centers = 0.5 * (bin_edges[:-1] + bin_edges[1:])
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=bin_centers,
+        y=counts,
+        marker_color='skyblue',
+        opacity=0.7,
+        name='Simulated Lead Times'
+    ))
+    fig.add_trace(go.Scatter(
+        x=[mean_lead_time, mean_lead_time],
+        y=[0, counts.max() * 1.1],
+        mode='lines',
+        line=dict(color='red', dash='dash', width=2),
+        name='Mean Lead Time'
+    ))
+    fig.update_layout(
+        title=f"Monte Carlo Simulation of Lead Times for Supplier {supplier_id}",
+        xaxis_title="Lead Time (days)",
+        yaxis_title="Frequency",
+        template='plotly_white'
+    )
+    return fig.to_json()
+
+
+class LeadTimeSimulator:
+    # Draws lead times for many suppliers at once into one
+    # (n_simulations x n_suppliers) matrix, transformed in place.
+    def __init__(self, supplier_ids, mean, std, distribution='truncnorm', seed=None):
+        if distribution not in LEAD_TIME_DISTRIBUTIONS:
+            raise ValueError(f"Unknown lead time distribution: {distribution}")
+        self.supplier_ids = np.asarray(supplier_ids)
+        self.positions = {int(supplier_id): i for i, supplier_id in enumerate(self.supplier_ids)}
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.distribution = distribution
+        self.rng = np.random.default_rng(seed)
+
+        # Lognormal parameters matched to the observed mean and variance.
+        mean = np.maximum(self.mean, 1e-9)
+        self.log_sigma = np.sqrt(np.log1p((self.std / mean) ** 2))
+        self.log_mu = np.log(mean) - self.log_sigma ** 2 / 2
+
+    def columns(self, supplier_ids=None):
+        if supplier_ids is None:
+            return np.arange(len(self.supplier_ids))
+        return np.array([self.positions[int(supplier_id)] for supplier_id in supplier_ids], dtype=np.int64)
+
+    def simulate(self, n_simulations=10000, supplier_ids=None, out=None, rng=None, common_random_numbers=False):
+        # With common_random_numbers every supplier is driven by the same
+        # column of draws, so a supplier's samples depend only on its own
+        # parameters and the seed, not on which suppliers are simulated with it.
+        from scipy.special import ndtr, ndtri
+
+        columns = self.columns(supplier_ids)
+        rng = rng or self.rng
+        if out is None:
+            out = np.empty((n_simulations, len(columns)))
+
+        if self.distribution == 'truncnorm':
+            # Inverse-CDF sampling of the normal restricted to lead times >= 0.
+            mean = self.mean[columns]
+            std = np.maximum(self.std[columns], 1e-9)
+            lower = ndtr(-mean / std)
+            if common_random_numbers:
+                out[:] = rng.random((len(out), 1))
+            else:
+                rng.random(out=out)
+            out *= 1 - lower
+            out += lower
+            np.minimum(out, np.nextafter(1.0, 0.0), out=out)
+            ndtri(out, out=out)
+            out *= std
+            out += mean
+            np.maximum(out, 0, out=out)
+        elif self.distribution == 'lognormal':
+            self.standard_normal(rng, out, common_random_numbers)
+            out *= self.log_sigma[columns]
+            out += self.log_mu[columns]
+            np.exp(out, out=out)
+        else:
+            self.standard_normal(rng, out, common_random_numbers)
+            out *= self.std[columns]
+            out += self.mean[columns]
+            np.maximum(out, 0, out=out)
+        return out
+
+    def standard_normal(self, rng, out, common_random_numbers):
+        if common_random_numbers:
+            out[:] = rng.standard_normal((len(out), 1))
+        else:
+            rng.standard_normal(out=out)
+
+    def summarize(self, n_simulations=10000, supplier_ids=None, quantiles=(0.025, 0.5, 0.975), bins=50, rng=None):
+        samples = self.simulate(n_simulations, supplier_ids, rng=rng)
+        summary = summarize_lead_times(samples, quantiles, bins)
+        summary['supplier_ids'] = self.supplier_ids[self.columns(supplier_ids)]
+        return summary
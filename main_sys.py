@@ -1,3 +1,7 @@
+import time
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from config import CONFIG
 from classifier import MedicineClassifier
 from ims1 import InventoryManagementSystem
@@ -8,32 +12,146 @@ from flask import Flask
 
 app = Flask(__name__)
 
+
+class LazyComponent:
+    # Stands in for a component until first use. Attribute access builds it
+    # once, under a lock of its own, so callers of a ready component never wait
+    # on the others.
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.instance = None
+        self.state = 'pending'
+        self.error = None
+        self.init_seconds = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        if self.instance is not None:
+            return self.instance
+        with self.lock:
+            if self.instance is None:
+                self.state = 'initializing'
+                start = time.perf_counter()
+                try:
+                    instance = self.factory()
+                except Exception as e:
+                    self.state = 'failed'
+                    self.error = str(e)
+                    self.init_seconds = time.perf_counter() - start
+                    raise
+                self.init_seconds = time.perf_counter() - start
+                self.error = None
+                self.instance = instance
+                self.state = 'ready'
+        return self.instance
+
+    def warm(self):
+        try:
+            self.get()
+            print(f"Initialized {self.name} in {self.init_seconds:.2f}s")
+        except Exception as e:
+            print(f"Error initializing {self.name}: {str(e)}")
+
+    @property
+    def ready(self):
+        return self.instance is not None
+
+    def status(self):
+        return {
+            'status': self.state,
+            'init_seconds': None if self.init_seconds is None else round(self.init_seconds, 3),
+            'error': self.error
+        }
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
 class HospitalSupplyChainSystem:
-    def __init__(self):
-        self.medicine_classifier = MedicineClassifier(CONFIG['medicine_data_path'])
-        self.inventory_system = InventoryManagementSystem(n_products= 20, n_days=365)
-        self.risk_assessor = SupplyChainRiskAssessment(CONFIG['sc_data_path'], CONFIG['sc2_data_path'])
-        self.route_optimizer = RouteOptimizer(
+    def __init__(self, warm=True, max_workers=None):
+        self.medicine_classifier = LazyComponent('medicine_classifier', lambda: MedicineClassifier(
+            CONFIG['medicine_data_path'],
+            artifact_dir=CONFIG['classifier_artifact_dir']
+        ))
+        self.inventory_system = LazyComponent('inventory_system', lambda: InventoryManagementSystem(
+            n_products= 20,
+            n_days=365,
+            model_dir=CONFIG['forecast_model_dir'],
+            max_workers=CONFIG['forecast_workers'],
+            default_backend=CONFIG['forecast_backend'],
+            backend_tiers=CONFIG['forecast_backend_tiers'],
+            forecast_cache_mb=CONFIG['forecast_cache_mb'],
+            alert_rules=CONFIG['alert_rules'],
+            data_source=CONFIG['inventory_data_source'],
+            data_path=CONFIG['inventory_data_path'],
+            cache_dir=CONFIG['inventory_cache_dir']
+        ))
+        self.risk_assessor = LazyComponent('risk_assessor', lambda: SupplyChainRiskAssessment(
+            CONFIG['sc_data_path'],
+            CONFIG['sc2_data_path'],
+            lead_time_distribution=CONFIG['lead_time_distribution'],
+            anomaly_window_size=CONFIG['anomaly_window_size'],
+            anomaly_refit_seconds=CONFIG['anomaly_refit_seconds']
+        ))
+        self.route_optimizer = LazyComponent('route_optimizer', lambda: RouteOptimizer(
             CONFIG[ 'hospital_address'],
             CONFIG['openweathermap_api_key'],
             CONFIG['tomtom_api_key']
-        )
-        self.risk_mitigator = RiskMitigator(
+        ))
+        # The mitigator only keeps references to the other components, so it
+        # gets their proxies and doesn't force them to build.
+        self.risk_mitigator = LazyComponent('risk_mitigator', lambda: RiskMitigator(
             self.medicine_classifier,
             self.inventory_system,
             self.risk_assessor,
-            self.route_optimizer
+            self.route_optimizer,
+            disruption_scenarios=CONFIG['disruption_scenarios'],
+            disruption_horizon=CONFIG['disruption_horizon_days'],
+            disruption_workers=CONFIG['disruption_workers']
+        ))
+        self.components = {
+            component.name: component
+            for component in [
+                self.medicine_classifier,
+                self.inventory_system,
+                self.risk_assessor,
+                self.route_optimizer,
+                self.risk_mitigator
+            ]
+        }
+        if warm:
+            self.warm_up(max_workers)
+
+    def warm_up(self, max_workers=None):
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self.components),
+            thread_name_prefix='component-init'
         )
+        futures = {name: executor.submit(component.warm) for name, component in self.components.items()}
+        executor.shutdown(wait=False)
+        return futures
+
+    def component_status(self):
+        return {name: component.status() for name, component in self.components.items()}
 
     def classify_medicines(self):
         return self.medicine_classifier.run_classification()
 
+    def refit_medicine_classifier(self):
+        return self.medicine_classifier.refit()
+
     def get_inventory_status(self):
         return self.inventory_system.get_inventory_status()
 
     def assess_supplier_risks(self):
         return self.risk_assessor.assess_all_supplier_risks()
 
+    def record_supplier_orders(self, orders):
+        orders = pd.DataFrame(orders)
+        flags = self.risk_assessor.record_orders(orders)
+        return flags.assign(supplier_id=orders['supplier_id'].to_numpy())
+
     def optimize_route(self):
         return self.route_optimizer.optimize_route()
 
@@ -1,18 +1,20 @@
+import re
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from scipy.optimize import minimize
-from sklearn.metrics.pairwise import cosine_similarity
 import traceback
+from disruption_sim import MITIGATION_OPTIONS, DisruptionSimulator
 
 
 class RiskMitigator:
-    def __init__(self, medicine_classifier, inventory_system, risk_assessor, route_optimizer):
+    def __init__(self, medicine_classifier, inventory_system, risk_assessor, route_optimizer,
+                 disruption_scenarios=5000, disruption_horizon=30, disruption_workers=None):
         self.medicine_classifier = medicine_classifier
         self.inventory_system = inventory_system
         self.risk_assessor = risk_assessor
         self.route_optimizer = route_optimizer
+        self.disruption_scenarios = disruption_scenarios
+        self.disruption_horizon = disruption_horizon
+        self.disruption_workers = disruption_workers
         self.rule_based_system = self.create_rule_based_system()
         self.ml_model = self.train_ml_model()
         self.past_situations = self.load_past_situations()
@@ -27,6 +29,9 @@ class RiskMitigator:
         }
 
     def train_ml_model(self):
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.model_selection import train_test_split
+
         n_samples = 1000
         np.random.seed(42)  
         risk_severity = np.random.beta(2, 5, n_samples)  
@@ -182,7 +187,7 @@ class RiskMitigator:
             # 1. Rule-based recommendations
             print("Getting supplier risks...")
             try:
-                supplier_risks = self.risk_assessor.assess_all_supplier_risks()
+                supplier_risks = self.risk_assessor.risk_store.latest_scores()
             except Exception as e:
                 print(f"Error getting supplier risks: {str(e)}")
                 supplier_risks = {}  
@@ -233,6 +238,9 @@ class RiskMitigator:
                 for medicine, status in inventory_status.items():
                     if status.get('stock_level', 0) < status.get('reorder_point', 0):
                         recommendations.append(f"Urgent reorder required for {medicine}")
+                        substitutes = self.find_substitutes(status.get('product_name', medicine))
+                        if substitutes:
+                            recommendations.append(f"Possible substitutes for {medicine}: {', '.join(substitutes)}")
                     elif status.get('stock_level', 0) > status.get('reorder_point', 0) * 2:
                         recommendations.append(f"Excess inventory detected for {medicine}. Consider reducing order quantities.")
  
@@ -309,6 +317,19 @@ class RiskMitigator:
         print(f"Final recommendation count: {len(recommendations)}")
         return recommendations
 
+    def find_substitutes(self, medicine, k=3):
+        # Only use a classifier that is already built; a report must not build
+        # it (or fail when its dataset is missing).
+        if not getattr(self.medicine_classifier, 'ready', True):
+            return []
+        try:
+            name = self.medicine_classifier.catalogue_name(medicine)
+            if name is not None:
+                return [item['name'] for item in self.medicine_classifier.find_substitutes(name, k)]
+        except Exception as e:
+            print(f"Error finding substitutes for {medicine}: {str(e)}")
+        return []
+
     def extract_features(self, recommendation):
         features = [0, 0, 0, 0, 0]  
         
@@ -390,6 +411,8 @@ class RiskMitigator:
         return features
 
     def optimize_strategy(self, supplier_risks, inventory_status, route_cost):
+        from scipy.optimize import minimize
+
         def objective(x):
             return -(0.4 * x[0] + 0.3 * x[1] + 0.3 * x[2])  
         def constraint1(x):
@@ -417,66 +440,53 @@ class RiskMitigator:
             elif any(keyword in rec_lower for keyword in ['route', 'delivery', 'schedule']):
                 route_recs.append(rec)
         
-        current_risk_level = self.calculate_current_risk_level()
-        current_cost = self.calculate_current_operational_cost()
-        scenarios = {}
-
+        all_recs = supplier_recs + inventory_recs + route_recs
+        # Dual sourcing only covers the suppliers the recommendations point at.
+        backed_suppliers = self.supplier_ids_at_risk(supplier_recs) if supplier_recs else None
+        options = {}
         if supplier_recs:
-            supplier_risk_reduction = min(len(supplier_recs) * 0.05, 0.3) 
-            supplier_cost_impact = len(supplier_recs) * 0.03  
-            
-            scenarios['Scenario A: Supplier Risk Focus'] = {
-                'risk_reduction': supplier_risk_reduction,
-                'risk_reduction_absolute': current_risk_level * supplier_risk_reduction,
-                'cost_impact': supplier_cost_impact,
-                'cost_impact_absolute': current_cost * supplier_cost_impact,
-                'recommendations': supplier_recs
-            }
-            
+            options['Scenario A: Supplier Risk Focus'] = (
+                {**MITIGATION_OPTIONS['dual_sourcing'], 'dual_sourcing': backed_suppliers},
+                supplier_recs
+            )
         if inventory_recs:
-            inventory_risk_reduction = min(len(inventory_recs) * 0.04, 0.25)  
-            inventory_cost_impact = -len(inventory_recs) * 0.02 
-            
-            scenarios['Scenario B: Inventory Optimization'] = {
-                'risk_reduction': inventory_risk_reduction,
-                'risk_reduction_absolute': current_risk_level * inventory_risk_reduction,
-                'cost_impact': inventory_cost_impact,
-                'cost_impact_absolute': current_cost * inventory_cost_impact,
-                'recommendations': inventory_recs
-            }
-        
+            options['Scenario B: Inventory Optimization'] = (MITIGATION_OPTIONS['safety_stock'], inventory_recs)
         if route_recs:
-            route_risk_reduction = min(len(route_recs) * 0.03, 0.2)  
-            route_cost_impact = -len(route_recs) * 0.04  
-            
-            scenarios['Scenario C: Route Optimization'] = {
-                'risk_reduction': route_risk_reduction,
-                'risk_reduction_absolute': current_risk_level * route_risk_reduction,
-                'cost_impact': route_cost_impact,
-                'cost_impact_absolute': current_cost * route_cost_impact,
-                'recommendations': route_recs
-            }
-        
-        all_recs = supplier_recs + inventory_recs + route_recs
-        if len(all_recs) >= 3: 
-            balanced_risk_reduction = min(len(all_recs) * 0.02, 0.35) 
-            supplier_weight = len(supplier_recs) / len(all_recs)
-            inventory_weight = len(inventory_recs) / len(all_recs)
-            route_weight = len(route_recs) / len(all_recs)
-            
-            balanced_cost_impact = (
-                supplier_weight * (0.03 * len(supplier_recs)) +  
-                inventory_weight * (-0.02 * len(inventory_recs)) +  
-                route_weight * (-0.04 * len(route_recs))  
+            options['Scenario C: Route Optimization'] = (MITIGATION_OPTIONS['route_optimization'], route_recs)
+        if len(all_recs) >= 3:
+            options['Scenario D: Balanced Approach'] = (
+                {**MITIGATION_OPTIONS['balanced'], 'dual_sourcing': backed_suppliers},
+                all_recs[:3]
             )
-            
-            scenarios['Scenario D: Balanced Approach'] = {
-                'risk_reduction': balanced_risk_reduction,
-                'risk_reduction_absolute': current_risk_level * balanced_risk_reduction,
-                'cost_impact': balanced_cost_impact,
-                'cost_impact_absolute': current_cost * balanced_cost_impact,
-                'recommendations': all_recs[:3] 
-            }
+
+        scenarios = {}
+        baseline = {}
+        if options:
+            try:
+                simulator = DisruptionSimulator.from_system(
+                    self.risk_assessor, self.inventory_system,
+                    horizon=self.disruption_horizon, n_workers=self.disruption_workers
+                )
+                outcomes = simulator.run(
+                    {'baseline': {}, **{name: option for name, (option, _) in options.items()}},
+                    n_scenarios=self.disruption_scenarios
+                )
+                baseline = outcomes.loc['baseline'].to_dict()
+                for name, (_, recs) in options.items():
+                    outcome = outcomes.loc[name]
+                    scenarios[name] = {
+                        'risk_reduction': float(outcome['risk_reduction']),
+                        'risk_reduction_absolute': float(baseline['stockout_probability'] - outcome['stockout_probability']),
+                        'cost_impact': float(outcome['cost_impact']),
+                        'cost_impact_absolute': float(outcome['cost_delta']),
+                        'stockout_probability': float(outcome['stockout_probability']),
+                        'expected_cost': float(outcome['expected_cost']),
+                        'recommendations': recs
+                    }
+            except Exception as e:
+                print(f"Error simulating disruption scenarios: {str(e)}")
+                traceback.print_exc()
+
         best_scenario = None
         best_score = float('-inf')
         
@@ -487,14 +497,27 @@ class RiskMitigator:
                 best_scenario = name
         results = {
             'scenarios': scenarios,
+            'baseline': baseline,
             'best_scenario': best_scenario,
             'summary': self.format_simulation_summary(scenarios, best_scenario)
         }
         
         return results
 
+    def supplier_ids_at_risk(self, supplier_recs):
+        # Suppliers named in the recommendations, else those the risk store
+        # rates high, else the three riskiest.
+        named = {int(match) for rec in supplier_recs for match in re.findall(r'Supplier (\d+)', rec)}
+        if named:
+            return sorted(named)
+        snapshot = self.risk_assessor.risk_store.snapshot()['risk_score']
+        high = snapshot[snapshot >= 0.7]
+        if high.empty:
+            high = snapshot.nlargest(3)
+        return [int(supplier_id) for supplier_id in high.index]
+
     def calculate_current_risk_level(self):
-        supplier_risks = self.risk_assessor.assess_all_supplier_risks()
+        supplier_risks = self.risk_assessor.risk_store.latest_scores()
         avg_supplier_risk = sum(supplier_risks.values()) / len(supplier_risks) if supplier_risks else 0.5
         inventory_risk = 0.4  
         route_risk = 0.3
@@ -528,6 +551,8 @@ class RiskMitigator:
         return "\n".join(summary)
     
     def find_similar_situations(self, supplier_risks, inventory_status, route_cost):
+        from sklearn.metrics.pairwise import cosine_similarity
+
         current_situation = np.array([
             np.mean(list(supplier_risks.values())),
             np.mean([status['stock_level'] for status in inventory_status.values()]),
@@ -577,7 +602,7 @@ class RiskMitigator:
         
         report_sections.append("\n".join(exec_summary))
     
-        supplier_risks = self.risk_assessor.assess_all_supplier_risks()
+        supplier_risks = self.risk_assessor.risk_store.latest_scores()
         avg_supplier_risk = sum(supplier_risks.values()) / len(supplier_risks) if supplier_risks else 0
         
         highest_risk_supplier = max(supplier_risks.items(), key=lambda x: x[1]) if supplier_risks else (None, 0)
@@ -590,6 +615,15 @@ class RiskMitigator:
         
         if highest_risk_supplier[0]:
             risk_summary.append(f"Highest Risk Supplier: {highest_risk_supplier[0]} (Score: {highest_risk_supplier[1]:.2f})")
+
+        trends = self.risk_assessor.risk_store.trends()
+        rising = trends[trends['window_change'] > 0]
+        if not rising.empty:
+            supplier_id = rising['window_change'].idxmax()
+            risk_summary.append(
+                f"Fastest Rising Risk: Supplier {int(supplier_id)} "
+                f"(+{rising.loc[supplier_id, 'window_change']:.2f} over {int(rising.loc[supplier_id, 'updates'])} updates)"
+            )
         
         risk_summary.extend([
             "Inventory Risk Areas:",
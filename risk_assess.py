@@ -1,17 +1,46 @@
+import threading
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
-from scipy.stats import norm
-import plotly.graph_objs as go
+from lead_time_sim import LeadTimeSimulator, lead_time_chart
+from supplier_stats import SupplierStats
+from anomaly_stream import CompiledForest, StreamingAnomalyDetector
+from risk_store import SupplierRiskStore, supplier_label
+
+SUPPLIER_FEATURES = [
+    'reliability_score', 'avg_lead_time', 'avg_defect_rate',
+    'on_time_delivery_rate', 'weather_risk', 'traffic_risk'
+]
+SC2_COLUMNS = ['supplier_id', 'quality_score', 'reliability_score', 'weather_risk', 'traffic_risk']
+
+
+def supplier_risk_score(supplier):
+    # Works on a single supplier record or on a whole supplier frame.
+    return (
+        (1 - supplier['reliability_score']) * 0.3 +
+        (supplier['avg_lead_time'] / 30) * 0.2 +
+        supplier['avg_defect_rate'] * 0.2 +
+        (1 - supplier['on_time_delivery_rate']) * 0.1 +
+        supplier['weather_risk'] * 0.1 +
+        supplier['traffic_risk'] * 0.1
+    )
         
 class SupplyChainRiskAssessment:
-    def __init__(self, sc_data_path, sc2_data_path):
-        self.sc_data = pd.read_csv("SC.csv")
-        self.sc2_data = pd.read_csv("SC2.csv")
-        self.suppliers = self.create_synthetic_supplier_data()
-        self.scaler = StandardScaler()
-        self.anomaly_detector = IsolationForest(contamination=0.1, random_state=42)
+    def __init__(self, sc_data_path, sc2_data_path, lead_time_distribution='truncnorm',
+                 anomaly_window_size=5000, anomaly_refit_seconds=300):
+        self.sc_data = pd.read_csv(sc_data_path)
+        self.sc2_data = pd.read_csv(sc2_data_path)
+        self.supplier_stats = SupplierStats(self.sc_data)
+        self.suppliers = self.build_supplier_profiles()
+        self.index_suppliers()
+        self.detectors = {}
+        self.supplier_anomaly_model = None
+        self.lead_time_distribution = lead_time_distribution
+        self.lead_time_simulator = None
+        self.anomaly_window_size = anomaly_window_size
+        self.anomaly_refit_seconds = anomaly_refit_seconds
+        self.order_stream = None
+        self.order_stream_lock = threading.Lock()
+        self.risk_store = SupplierRiskStore(self)
 
     def create_synthetic_supplier_data(self):
         suppliers = pd.DataFrame({
@@ -25,45 +54,180 @@ class SupplyChainRiskAssessment:
         })
         return suppliers
 
+    def build_supplier_profiles(self):
+        # SC2 supplies the static attributes and the SC order statistics the
+        # delivery ones; suppliers with no orders get the all-order averages.
+        if not set(SC2_COLUMNS).issubset(self.sc2_data.columns):
+            return self.create_synthetic_supplier_data()
+        sc2 = self.sc2_data.drop_duplicates('supplier_id').set_index('supplier_id')
+        table = self.supplier_stats.table
+        stats = table.reindex(sc2.index)
+        if len(table):
+            fallback_lead_time = np.average(table['lead_time_mean'], weights=table['n_orders'])
+            fallback_lateness = np.average(table['lateness_rate'], weights=table['n_orders'])
+        else:
+            fallback_lead_time, fallback_lateness = 0.0, 0.0
+        return pd.DataFrame({
+            'supplier_id': sc2.index.to_numpy(),
+            'reliability_score': sc2['reliability_score'].to_numpy(dtype=np.float64),
+            'avg_lead_time': stats['lead_time_mean'].fillna(fallback_lead_time).to_numpy(),
+            'avg_defect_rate': 1 - sc2['quality_score'].to_numpy(dtype=np.float64),
+            'on_time_delivery_rate': 1 - stats['lateness_rate'].fillna(fallback_lateness).to_numpy(),
+            'weather_risk': sc2['weather_risk'].to_numpy(dtype=np.float64),
+            'traffic_risk': sc2['traffic_risk'].to_numpy(dtype=np.float64)
+        })
+
+    def index_suppliers(self):
+        self.profiles = self.suppliers.set_index('supplier_id')[SUPPLIER_FEATURES].to_dict('index')
+
+    def update_supplier(self, supplier_id, reason='update', **attributes):
+        # e.g. update_supplier(3, reason='weather', weather_risk=0.8)
+        unknown = set(attributes) - set(SUPPLIER_FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown supplier attributes: {', '.join(sorted(unknown))}")
+        if supplier_id not in self.profiles:
+            raise KeyError(f"Unknown supplier: {supplier_id}")
+        rows = (self.suppliers['supplier_id'] == supplier_id).to_numpy()
+        for column, value in attributes.items():
+            self.suppliers.loc[rows, column] = value
+        self.profiles[supplier_id].update(attributes)
+        if 'avg_lead_time' in attributes:
+            self.lead_time_simulator = None
+        self.risk_store.update([supplier_id], reason)
+        return self.profiles[supplier_id]
+
+    def append_orders(self, orders):
+        # New order rows only refresh the statistics and profiles of the
+        # suppliers that appear in them.
+        if len(orders) == 0:
+            return np.array([], dtype=np.int64)
+        self.sc_data = pd.concat([self.sc_data, orders], ignore_index=True)
+        touched = self.supplier_stats.append(orders)
+
+        rows = self.suppliers['supplier_id'].isin(touched).to_numpy()
+        supplier_ids = self.suppliers.loc[rows, 'supplier_id'].to_numpy()
+        stats = self.supplier_stats.table.loc[supplier_ids]
+        self.suppliers.loc[rows, 'avg_lead_time'] = stats['lead_time_mean'].to_numpy()
+        self.suppliers.loc[rows, 'on_time_delivery_rate'] = 1 - stats['lateness_rate'].to_numpy()
+        for supplier_id, lead_time, lateness in zip(supplier_ids, stats['lead_time_mean'], stats['lateness_rate']):
+            profile = self.profiles[supplier_id]
+            profile['avg_lead_time'] = lead_time
+            profile['on_time_delivery_rate'] = 1 - lateness
+
+        self.lead_time_simulator = None
+        if self.order_stream is not None:
+            self.order_stream.add(orders)
+        self.risk_store.update(supplier_ids, 'orders')
+        return touched
+
+    def get_order_stream(self):
+        # Built on first use from the most recent orders, then kept current
+        # by append_orders and refitted in the background.
+        with self.order_stream_lock:
+            if self.order_stream is None:
+                stream = StreamingAnomalyDetector(
+                    window_size=self.anomaly_window_size,
+                    refit_interval=self.anomaly_refit_seconds
+                )
+                stream.prime(self.sc_data.tail(self.anomaly_window_size))
+                stream.start()
+                self.order_stream = stream
+            return self.order_stream
+
+    def flag_orders(self, orders):
+        return self.get_order_stream().score(orders)
+
+    def record_orders(self, orders):
+        # New orders are scored against the current window before they join it.
+        flags = self.flag_orders(orders)
+        self.append_orders(orders)
+        return flags
+
+    def base_risk_scores(self, suppliers):
+        return supplier_risk_score(suppliers).to_numpy(dtype=np.float64)
+
     def assess_supplier_risk(self, supplier_id):
-        supplier = self.suppliers[self.suppliers['supplier_id'] == supplier_id].iloc[0]
-        risk_score = (
-            (1 - supplier['reliability_score']) * 0.3 +
-            (supplier['avg_lead_time'] / 30) * 0.2 +
-            supplier['avg_defect_rate'] * 0.2 +
-            (1 - supplier['on_time_delivery_rate']) * 0.1 +
-            supplier['weather_risk'] * 0.1 +
-            supplier['traffic_risk'] * 0.1
-        )
-        return risk_score
-    def assess_all_supplier_risks(self):
+        return supplier_risk_score(self.profiles[supplier_id])
 
-        risk_scores = {}
-        for index, row in self.suppliers.iterrows():
-
-            supplier_id = row['supplier_id']
-            risk_score = self.assess_supplier_risk(supplier_id)
-            try:
-                X = supplier_id.drop('supplier_id').values.reshape(1, -1)
-                X_scaled = self.scaler.transform(X)
-                anomaly_score = self.anomaly_detector.decision_function(X_scaled)[0]
-                if anomaly_score < 0:
-                    anomaly_adjustment = min(0.2, abs(anomaly_score) * 0.1)
-                    risk_score = min(1.0, risk_score + anomaly_adjustment)
-            except:
-                pass
-            
-            try:
-                simulation_results = self.monte_carlo_simulation(supplier_id, n_simulations=1000)
-                confidence_interval = simulation_results['95%_confidence_interval']
-                interval_width = confidence_interval[1] - confidence_interval[0]
-                uncertainty_factor = min(0.15, interval_width / 30)  
-                risk_score = min(1.0, risk_score + uncertainty_factor)
-            except:
-                pass
-        
-            supplier_name = f"Supplier {supplier_id}"
-            risk_scores[supplier_name] = round(risk_score, 2)
+    def anomaly_adjustments(self, suppliers, refit=True):
+        # Suppliers whose profile is an outlier among all suppliers get up to
+        # +0.2. The scaler and forest are separate from the ones used by
+        # predict_disruptions; the model fitted on self.suppliers is kept,
+        # compiled, so single suppliers can be rescored with refit=False.
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+
+        X = suppliers[SUPPLIER_FEATURES].to_numpy(dtype=np.float64)
+        if refit:
+            if len(suppliers) < 2:
+                return np.zeros(len(suppliers))
+            scaler = StandardScaler().fit(X)
+            forest = IsolationForest(contamination=0.1, random_state=42).fit(scaler.transform(X))
+            model = CompiledForest(scaler, forest, len(X))
+            if suppliers is self.suppliers:
+                self.supplier_anomaly_model = model
+        else:
+            if self.supplier_anomaly_model is None:
+                self.anomaly_adjustments(self.suppliers)
+            if self.supplier_anomaly_model is None:
+                return np.zeros(len(suppliers))
+            model = self.supplier_anomaly_model
+        anomaly_scores = model.score(X)
+        return np.where(anomaly_scores < 0, np.minimum(0.2, np.abs(anomaly_scores) * 0.1), 0.0)
+
+    def build_lead_time_simulator(self, suppliers):
+        # Lead-time spread comes from the precomputed order statistics;
+        # suppliers without order history fall back to avg_lead_time +/- 20%.
+        history = self.supplier_stats.table[['lead_time_mean', 'lead_time_std']]
+        history = history.reindex(suppliers['supplier_id'].to_numpy())
+        fallback = suppliers['avg_lead_time'].to_numpy(dtype=np.float64)
+        mean = history['lead_time_mean'].fillna(pd.Series(fallback, index=history.index))
+        std = history['lead_time_std'].fillna(mean * 0.2)
+        return LeadTimeSimulator(history.index.to_numpy(), mean.to_numpy(), std.to_numpy(), self.lead_time_distribution)
+
+    def get_lead_time_simulator(self):
+        if self.lead_time_simulator is None:
+            self.lead_time_simulator = self.build_lead_time_simulator(self.suppliers)
+        return self.lead_time_simulator
+
+    def lead_time_uncertainty(self, suppliers, n_simulations=1000, supplier_ids=None):
+        # Width of each supplier's 95% lead-time interval from one batched
+        # simulation. The fixed seed and common random numbers keep a
+        # supplier's value the same whether it is scored alone or with all.
+        if suppliers is self.suppliers or supplier_ids is not None:
+            simulator = self.get_lead_time_simulator()
+        else:
+            simulator = self.build_lead_time_simulator(suppliers)
+        samples = simulator.simulate(n_simulations, supplier_ids, rng=np.random.default_rng(42), common_random_numbers=True)
+        lower, upper = np.quantile(samples, [0.025, 0.975], axis=0)
+        return np.minimum(0.15, (upper - lower) / 30)
+
+    def score_suppliers(self, suppliers=None, supplier_ids=None):
+        # supplier_ids rescores just those suppliers, against the anomaly
+        # model from the last full scoring.
+        if supplier_ids is not None:
+            suppliers = self.suppliers[self.suppliers['supplier_id'].isin(supplier_ids)]
+            anomaly_adjustment = self.anomaly_adjustments(suppliers, refit=False)
+            uncertainty = self.lead_time_uncertainty(suppliers, supplier_ids=suppliers['supplier_id'].to_numpy())
+        else:
+            suppliers = self.suppliers if suppliers is None else suppliers
+            anomaly_adjustment = self.anomaly_adjustments(suppliers)
+            uncertainty = self.lead_time_uncertainty(suppliers)
+        base_score = self.base_risk_scores(suppliers)
+        risk_score = np.minimum(1.0, np.minimum(1.0, base_score + anomaly_adjustment) + uncertainty)
+        return pd.DataFrame({
+            'base_score': base_score,
+            'anomaly_adjustment': anomaly_adjustment,
+            'uncertainty': uncertainty,
+            'risk_score': risk_score
+        }, index=pd.Index(suppliers['supplier_id'].to_numpy(), name='supplier_id'))
+
+    def assess_all_supplier_risks(self):
+        scores = self.risk_store.refresh()
+        risk_scores = {
+            supplier_label(supplier_id): round(float(risk_score), 2)
+            for supplier_id, risk_score in zip(scores.index, scores['risk_score'])
+        }
         
         high_risk_suppliers = {k: v for k, v in risk_scores.items() if v >= 0.7}
         if high_risk_suppliers:
@@ -74,16 +238,28 @@ class SupplyChainRiskAssessment:
         
         return risk_scores
     
+    def detector(self, feature_set):
+        # One scaler/forest pair per feature set, so fitting one never
+        # replaces the fit another caller relies on.
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+
+        if feature_set not in self.detectors:
+            self.detectors[feature_set] = (StandardScaler(), IsolationForest(contamination=0.1, random_state=42))
+        return self.detectors[feature_set]
+
     def predict_disruptions(self):
-        X = self.scaler.fit_transform(self.suppliers.drop('supplier_id', axis=1))
-        self.anomaly_detector.fit(X)
-        anomaly_scores = self.anomaly_detector.decision_function(X)
+        scaler, anomaly_detector = self.detector('suppliers')
+        X = scaler.fit_transform(self.suppliers[SUPPLIER_FEATURES])
+        anomaly_detector.fit(X)
+        anomaly_scores = anomaly_detector.decision_function(X)
         self.suppliers['anomaly_score'] = anomaly_scores
         return self.suppliers[self.suppliers['anomaly_score'] < 0]
 
     def detect_unusual_patterns(self, data):
-        X = self.scaler.fit_transform(data)
-        anomalies = self.anomaly_detector.fit_predict(X)
+        scaler, anomaly_detector = self.detector(tuple(data.columns))
+        X = scaler.fit_transform(data)
+        anomalies = anomaly_detector.fit_predict(X)
         return data[anomalies == -1]
 
     def calculate_supplier_reliability(self):
@@ -93,69 +269,54 @@ class SupplyChainRiskAssessment:
             (1 - self.suppliers['avg_defect_rate']) * 0.2 +
             self.suppliers['on_time_delivery_rate'] * 0.3
         )
+        self.index_suppliers()
+        self.risk_store.update(self.suppliers['supplier_id'].to_numpy(), 'reliability')
         return self.suppliers[['supplier_id', 'reliability_score']]
 
-    def monte_carlo_simulation(self, supplier_id, n_simulations=10000):
-        supplier = self.suppliers[self.suppliers['supplier_id'] == supplier_id].iloc[0]
-        lead_time_mean = supplier['avg_lead_time']
-        lead_time_std = lead_time_mean * 0.2  
-        
-        simulated_lead_times = np.random.normal(lead_time_mean, lead_time_std, n_simulations)
-        simulated_lead_times = np.maximum(simulated_lead_times, 0)  
-        counts, bins = np.histogram(simulated_lead_times, bins=50)
-        bin_centers = 0.5 * (bins[:-1] + bins[1:])
-    
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=bin_centers,
-            y=counts,
-            marker_color='skyblue',
-            opacity=0.7,
-            name='Simulated Lead Times'
-        ))
-        fig.add_trace(go.Scatter(
-            x=[lead_time_mean, lead_time_mean],
-            y=[0, counts.max() * 1.1],
-            mode='lines',
-            line=dict(color='red', dash='dash', width=2),
-            name='Mean Lead Time'
-        ))
-        fig.update_layout(
-            title=f"Monte Carlo Simulation of Lead Times for Supplier {supplier_id}",
-            xaxis_title="Lead Time (days)",
-            yaxis_title="Frequency",
-            template='plotly_white'
-        )
-        confidence_interval = norm.interval(0.95, loc=lead_time_mean, scale=lead_time_std)
-        
-        return {
-            'chart': fig.to_json(),
-            'mean_lead_time': lead_time_mean,
-            '95%_confidence_interval': confidence_interval.tolist() if hasattr(confidence_interval, 'tolist') else list(confidence_interval)
+    def monte_carlo_simulation(self, supplier_id, n_simulations=10000, include_chart=True):
+        simulator = self.get_lead_time_simulator()
+        summary = simulator.summarize(n_simulations, supplier_ids=[supplier_id], quantiles=(0.025, 0.975))
+        mean_lead_time = float(summary['mean'][0])
+
+        result = {
+            'mean_lead_time': mean_lead_time,
+            '95%_confidence_interval': summary['quantiles'][:, 0].tolist(),
+            'distribution': simulator.distribution
         }
+        if include_chart:
+            result['chart'] = lead_time_chart(supplier_id, summary['counts'][0], summary['bin_edges'][0], mean_lead_time)
+        return result
+
+    def simulate_lead_times(self, n_simulations=10000, quantiles=(0.025, 0.5, 0.975), bins=50):
+        return self.get_lead_time_simulator().summarize(n_simulations, quantiles=quantiles, bins=bins)
         
-risk_assessor = SupplyChainRiskAssessment('SC', 'SC2')
+if __name__ == '__main__':
+    risk_assessor = SupplyChainRiskAssessment('dataset/SC.csv', 'dataset/SC2.csv')
+
 
+    supplier_id = 1
+    risk_score = risk_assessor.assess_supplier_risk(supplier_id)
+    print(f"Risk score for supplier {supplier_id}: {risk_score:.2f}")
 
-supplier_id = 1
-risk_score = risk_assessor.assess_supplier_risk(supplier_id)
-print(f"Risk score for supplier {supplier_id}: {risk_score:.2f}")
 
+    disruptions = risk_assessor.predict_disruptions()
+    print("\nPotential disruptions:")
+    print(disruptions)
 
-disruptions = risk_assessor.predict_disruptions()
-print("\nPotential disruptions:")
-print(disruptions)
+    unusual_patterns = risk_assessor.detect_unusual_patterns(risk_assessor.sc_data[['Days_for_shipping_real', 'Days_for_shipment_scheduled', 'Benefit_per_order']])
+    print("\nUnusual patterns in shipping data:")
+    print(unusual_patterns)
 
-unusual_patterns = risk_assessor.detect_unusual_patterns(risk_assessor.sc_data[['Days_for_shipping_real', 'Days_for_shipment_scheduled', 'Benefit_per_order']])
-print("\nUnusual patterns in shipping data:")
-print(unusual_patterns)
+    order_flags = risk_assessor.flag_orders(risk_assessor.sc_data.tail(100))
+    print("\nFlagged recent orders:")
+    print(order_flags[order_flags['anomalous']])
 
 
-reliability_scores = risk_assessor.calculate_supplier_reliability()
-print("\nSupplier reliability scores:")
-print(reliability_scores)
+    reliability_scores = risk_assessor.calculate_supplier_reliability()
+    print("\nSupplier reliability scores:")
+    print(reliability_scores)
 
-simulation_result = risk_assessor.monte_carlo_simulation(supplier_id)
-print(f"\nMonte Carlo simulation results for supplier {supplier_id}:")
-print(f"Mean lead time: {simulation_result['mean_lead_time']:.2f} days")
-print(f"95% Confidence Interval: {simulation_result['95%_confidence_interval']}")
\ No newline at end of file
+    simulation_result = risk_assessor.monte_carlo_simulation(supplier_id)
+    print(f"\nMonte Carlo simulation results for supplier {supplier_id}:")
+    print(f"Mean lead time: {simulation_result['mean_lead_time']:.2f} days")
+    print(f"95% Confidence Interval: {simulation_result['95%_confidence_interval']}")
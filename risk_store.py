@@ -0,0 +1,93 @@
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+RISK_COMPONENTS = ['base_score', 'anomaly_adjustment', 'uncertainty', 'risk_score']
+
+
+def supplier_label(supplier_id):
+    return f"Supplier {int(supplier_id)}"
+
+
+class SupplierRiskStore:
+    # Timestamped history of risk components per supplier. A full refresh
+    # scores every supplier; update() rescores only the suppliers whose
+    # inputs changed. Readers get the latest snapshot without rescoring.
+    def __init__(self, risk_assessor, max_history=500):
+        self.risk_assessor = risk_assessor
+        self.max_history = max_history
+        self.latest = {}
+        self.history = {}
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def record(self, scores, reason, timestamp=None):
+        timestamp = timestamp or datetime.now()
+        records = scores[RISK_COMPONENTS].astype(np.float64).to_dict('index')
+        with self.lock:
+            for supplier_id, components in records.items():
+                supplier_id = int(supplier_id)
+                record = {'timestamp': timestamp, 'reason': reason, **components}
+                self.latest[supplier_id] = record
+                if supplier_id not in self.history:
+                    self.history[supplier_id] = deque(maxlen=self.max_history)
+                self.history[supplier_id].append(record)
+            self.version += 1
+        return records
+
+    def refresh(self, reason='full'):
+        scores = self.risk_assessor.score_suppliers()
+        self.record(scores, reason)
+        return scores
+
+    def update(self, supplier_ids, reason):
+        # Before the first refresh there is nothing to keep current; the
+        # first read scores everyone.
+        if not self.latest or len(supplier_ids) == 0:
+            return None
+        scores = self.risk_assessor.score_suppliers(supplier_ids=supplier_ids)
+        self.record(scores, reason)
+        return scores
+
+    def ensure(self):
+        if not self.latest:
+            self.refresh()
+
+    def snapshot(self):
+        self.ensure()
+        with self.lock:
+            latest = dict(self.latest)
+        snapshot = pd.DataFrame.from_dict(latest, orient='index')
+        snapshot.index.name = 'supplier_id'
+        return snapshot.sort_index()
+
+    def latest_scores(self):
+        self.ensure()
+        with self.lock:
+            return {
+                supplier_label(supplier_id): round(record['risk_score'], 2)
+                for supplier_id, record in sorted(self.latest.items())
+            }
+
+    def supplier_history(self, supplier_id=None):
+        self.ensure()
+        with self.lock:
+            if supplier_id is None:
+                rows = [{'supplier_id': s, **record} for s, records in self.history.items() for record in records]
+            else:
+                rows = [{'supplier_id': supplier_id, **record} for record in self.history.get(supplier_id, ())]
+        return pd.DataFrame(rows, columns=['supplier_id', 'timestamp', 'reason'] + RISK_COMPONENTS)
+
+    def trends(self, since=None):
+        history = self.supplier_history()
+        if since is not None:
+            history = history[history['timestamp'] >= since]
+        history = history.assign(previous=history.groupby('supplier_id')['risk_score'].shift(1))
+        grouped = history.groupby('supplier_id')
+        trends = grouped['risk_score'].agg(latest='last', first='first', mean='mean', max='max', updates='size')
+        trends['previous'] = grouped['previous'].last().fillna(trends['latest'])
+        trends['change'] = trends['latest'] - trends['previous']
+        trends['window_change'] = trends['latest'] - trends['first']
+        return trends
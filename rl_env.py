@@ -0,0 +1,262 @@
+import numpy as np
+
+ORDERING_COST = 100
+HOLDING_COST_RATE = 0.2
+STOCKOUT_COST_FACTOR = 1.0
+DEFAULT_MAX_STOCK = 1000
+
+
+def stock_scale(demand, lead_times):
+    # Enough to cover the lead time plus a month of average demand.
+    avg_demand = np.maximum(np.asarray(demand, dtype=np.float64).mean(axis=1), 1)
+    lead_times = np.maximum(np.rint(np.asarray(lead_times, dtype=np.float64)), 1)
+    return avg_demand * (lead_times + 30)
+
+
+class InventoryRLAgent:
+    def __init__(self, n_products, n_states=10, n_actions=10):
+        self.n_products = n_products
+        self.n_states = n_states
+        self.n_actions = n_actions
+        self.q_table = np.zeros((n_products, n_states, n_actions))
+        self.learning_rate = 0.1
+        self.discount_factor = 0.95
+        self.epsilon = 0.1
+        self.policy = None
+
+        # Per-product state/order scale (indexed by product_id - 1); set from
+        # the training env so serving maps stock levels the same way.
+        self.max_stock = np.full(n_products, DEFAULT_MAX_STOCK, dtype=np.float64)
+        self.max_order = np.full(n_products, DEFAULT_MAX_STOCK, dtype=np.float64)
+
+        # Action i orders i / (n_actions - 1) of the maximum order quantity.
+        self.order_fractions = np.linspace(0, 1, n_actions)
+        self.action_meanings = {0: "No order needed", n_actions - 1: "Order maximum quantity"}
+        for action_idx in range(1, n_actions - 1):
+            self.action_meanings[action_idx] = f"Order {self.order_fractions[action_idx]:.0%} of max quantity"
+
+    def set_scale(self, product_ids, max_stock, max_order=None):
+        rows = np.asarray(product_ids) - 1
+        self.max_stock[rows] = max_stock
+        self.max_order[rows] = max_stock if max_order is None else max_order
+
+    def get_state_index(self, stock_level, max_stock=1000):
+        state_size = max_stock / self.n_states
+        return min(int(stock_level / state_size), self.n_states - 1)
+
+    def get_state_indices(self, stock_levels, max_stock=1000):
+        state_size = np.asarray(max_stock, dtype=np.float64) / self.n_states
+        states = (np.asarray(stock_levels, dtype=np.float64) / state_size).astype(np.int64)
+        return np.clip(states, 0, self.n_states - 1)
+
+    def get_action(self, product_id, stock_level, max_stock=None, max_order=None):
+        if max_stock is None:
+            max_stock = self.max_stock[product_id-1]
+        if max_order is None:
+            max_order = self.max_order[product_id-1]
+        state = self.get_state_index(stock_level, max_stock)
+
+        if self.policy is not None:
+            action_idx = int(self.policy[product_id-1, state])
+        elif np.random.random() < self.epsilon:
+            action_idx = np.random.randint(0, self.n_actions)
+        else:
+            action_idx = int(np.argmax(self.q_table[product_id-1, state]))
+
+        order_quantity = self.order_fractions[action_idx] * max_order
+            
+        return {
+            'action_idx': action_idx, 
+            'action_meaning': self.action_meanings[action_idx],
+            'order_quantity': int(order_quantity)
+        }
+
+    def get_actions(self, product_ids, states, rng=None, greedy=False):
+        # Batched epsilon-greedy over state indices; product_ids are 1-based.
+        rows = np.asarray(product_ids) - 1
+        actions = self.q_table[rows, states].argmax(axis=1)
+        if greedy or self.epsilon <= 0:
+            return actions
+        rng = rng or np.random.default_rng()
+        explore = rng.random(len(actions)) < self.epsilon
+        return np.where(explore, rng.integers(0, self.n_actions, len(actions)), actions)
+
+    def fallback_actions(self):
+        # Order-up-to rule for states training never reached: order enough to
+        # bring the middle of the state back up to max_stock.
+        fractions = 1 - (np.arange(self.n_states) + 0.5) / self.n_states
+        return np.rint(fractions * (self.n_actions - 1)).astype(np.int8)
+
+    def export_policy(self, path=None, visits=None):
+        # With visit counts, untried actions can't win the argmax just because
+        # their Q-value is still the initial zero.
+        if visits is None:
+            policy = self.q_table.argmax(axis=2).astype(np.int8)
+        else:
+            visited = visits > 0
+            policy = np.where(visited, self.q_table, -np.inf).argmax(axis=2).astype(np.int8)
+            unseen = ~visited.any(axis=2)
+            policy[unseen] = np.broadcast_to(self.fallback_actions(), policy.shape)[unseen]
+        if path is not None:
+            np.savez(path, policy=policy, max_stock=self.max_stock, max_order=self.max_order)
+        return policy
+
+    def load_policy(self, policy):
+        if isinstance(policy, str):
+            with np.load(policy) as saved:
+                policy = saved['policy']
+                self.max_stock = saved['max_stock'].astype(np.float64)
+                self.max_order = saved['max_order'].astype(np.float64)
+        self.policy = np.asarray(policy)
+
+    def policy_actions(self, product_ids, stock_levels, max_stock=None, max_order=None):
+        # Frozen greedy inference for any number of products: one gather, no epsilon.
+        rows = np.asarray(product_ids) - 1
+        if max_stock is None:
+            max_stock = self.max_stock[rows]
+        if max_order is None:
+            max_order = self.max_order[rows]
+        states = self.get_state_indices(stock_levels, max_stock)
+        actions = self.policy[rows, states]
+        return actions, self.order_fractions[actions] * max_order
+
+    def update_q_table(self, product_id, stock_level, action_info, reward, next_stock_level):
+        state = self.get_state_index(stock_level, self.max_stock[product_id-1])
+        next_state = self.get_state_index(next_stock_level, self.max_stock[product_id-1])
+        action_idx = action_info['action_idx']
+        old_value = self.q_table[product_id-1, state, action_idx]
+        next_max = np.max(self.q_table[product_id-1, next_state])
+        new_value = (1 - self.learning_rate) * old_value + \
+                    self.learning_rate * (reward + self.discount_factor * next_max)
+        
+        self.q_table[product_id-1, state, action_idx] = new_value
+        
+        return new_value
+
+    def update_q_table_batch(self, product_ids, states, actions, rewards, next_states, done=None):
+        rows = np.asarray(product_ids) - 1
+        next_max = self.q_table[rows, next_states].max(axis=1)
+        if done is not None:
+            next_max = np.where(done, 0.0, next_max)
+        targets = np.asarray(rewards, dtype=np.float64) + self.discount_factor * next_max
+
+        # Transitions that hit the same (product, state, action) cell are
+        # averaged into one update rather than last-write-wins.
+        flat = np.ravel_multi_index((rows, states, actions), self.q_table.shape)
+        cells, inverse, counts = np.unique(flat, return_inverse=True, return_counts=True)
+        mean_targets = np.bincount(inverse, weights=targets) / counts
+        q_flat = self.q_table.reshape(-1)
+        q_flat[cells] = (1 - self.learning_rate) * q_flat[cells] + self.learning_rate * mean_targets
+        return q_flat[cells]
+
+
+class InventoryEnv:
+    # Steps every (replica, product) pair at once. Each row replays a window of
+    # that product's demand history, orders arrive after the product's lead
+    # time, and unmet demand is lost.
+    def __init__(self, demand, product_ids, lead_times, unit_costs, max_stock=None, n_replicas=1,
+                 episode_length=90, n_states=10, n_actions=10, demand_noise=0.1,
+                 ordering_cost=ORDERING_COST, holding_cost_rate=HOLDING_COST_RATE,
+                 stockout_cost_factor=STOCKOUT_COST_FACTOR, seed=None):
+        self.demand = np.asarray(demand, dtype=np.float64)
+        self.n_products, self.n_days = self.demand.shape
+        self.episode_length = min(episode_length, self.n_days)
+        self.n_replicas = n_replicas
+        self.n_states = n_states
+        self.order_fractions = np.linspace(0, 1, n_actions)
+        self.demand_noise = demand_noise
+        self.rng = np.random.default_rng(seed)
+
+        self.product_index = np.tile(np.arange(self.n_products), n_replicas)
+        self.product_ids = np.asarray(product_ids)[self.product_index]
+        self.lead_times = np.maximum(np.rint(np.asarray(lead_times, dtype=np.float64)), 1).astype(np.int64)[self.product_index]
+        unit_costs = np.asarray(unit_costs, dtype=np.float64)[self.product_index]
+
+        avg_demand = np.maximum(self.demand.mean(axis=1), 1)[self.product_index]
+        if max_stock is None:
+            max_stock = stock_scale(self.demand, lead_times)[self.product_index]
+        else:
+            max_stock = np.broadcast_to(np.asarray(max_stock, dtype=np.float64), (self.n_products,))[self.product_index]
+        self.max_stock = max_stock
+        self.max_order = max_stock
+
+        # Costs are scaled by a day's demand value so rewards are comparable across products.
+        scale = avg_demand * unit_costs
+        self.ordering_cost = ordering_cost / scale
+        self.holding_cost = holding_cost_rate / 365 * unit_costs / scale
+        self.stockout_cost = stockout_cost_factor * unit_costs / scale
+
+        self.n_envs = len(self.product_index)
+        self.max_lead = int(self.lead_times.max())
+        self.reset()
+
+    @classmethod
+    def from_inventory(cls, inventory_system, **kwargs):
+        policy = inventory_system.optimize_all_stock_levels()
+        product_ids, demand = inventory_system.store.demand_matrix()
+        return cls(
+            demand,
+            product_ids,
+            policy.loc[product_ids, 'lead_time'].to_numpy(),
+            policy.loc[product_ids, 'unit_cost'].to_numpy(),
+            **kwargs
+        )
+
+    def reset(self):
+        self.t = 0
+        self.starts = self.rng.integers(0, self.n_days - self.episode_length + 1, self.n_envs)
+        self.on_hand = self.rng.uniform(0.2, 0.8, self.n_envs) * self.max_stock
+        self.pipeline = np.zeros((self.n_envs, self.max_lead + 1))
+        return self.states()
+
+    def inventory_position(self):
+        return self.on_hand + self.pipeline.sum(axis=1)
+
+    def states(self):
+        states = (self.inventory_position() / (self.max_stock / self.n_states)).astype(np.int64)
+        return np.clip(states, 0, self.n_states - 1)
+
+    def step(self, actions):
+        rows = np.arange(self.n_envs)
+        order_quantity = self.order_fractions[actions] * self.max_order
+        self.pipeline[rows, (self.t + self.lead_times) % (self.max_lead + 1)] += order_quantity
+
+        slot = self.t % (self.max_lead + 1)
+        self.on_hand += self.pipeline[:, slot]
+        self.pipeline[:, slot] = 0
+
+        demand = self.demand[self.product_index, self.starts + self.t]
+        if self.demand_noise:
+            demand = np.maximum(demand * (1 + self.demand_noise * self.rng.standard_normal(self.n_envs)), 0)
+        sales = np.minimum(self.on_hand, demand)
+        lost = demand - sales
+        self.on_hand -= sales
+
+        cost = (
+            self.ordering_cost * (order_quantity > 0) +
+            self.holding_cost * self.on_hand +
+            self.stockout_cost * lost
+        )
+        self.t += 1
+        done = self.t >= self.episode_length
+        return self.states(), -cost, done, {'demand': demand, 'lost_sales': lost, 'order_quantity': order_quantity}
+
+
+def train_agent(agent, env, n_episodes=10, seed=None, visits=None):
+    rng = np.random.default_rng(seed)
+    episode_rewards = []
+    for _ in range(n_episodes):
+        states = env.reset()
+        total_reward = np.zeros(env.n_envs)
+        done = False
+        while not done:
+            actions = agent.get_actions(env.product_ids, states, rng)
+            next_states, rewards, done, _ = env.step(actions)
+            agent.update_q_table_batch(env.product_ids, states, actions, rewards, next_states)
+            if visits is not None:
+                cells = np.ravel_multi_index((env.product_ids - 1, states, actions), visits.shape)
+                np.add.at(visits.reshape(-1), cells, 1)
+            total_reward += rewards
+            states = next_states
+        episode_rewards.append(float(total_reward.mean()))
+    return episode_rewards
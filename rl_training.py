@@ -0,0 +1,118 @@
+import os
+import glob
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from rl_env import InventoryEnv, InventoryRLAgent, stock_scale, train_agent
+
+
+def run_training_worker(env_kwargs, q_table, agent_params, n_episodes, seed):
+    # One demand scenario: the seed drives the env's start windows and demand noise.
+    env = InventoryEnv(**env_kwargs, seed=seed)
+    agent = InventoryRLAgent(q_table.shape[0], q_table.shape[1], q_table.shape[2])
+    for name, value in agent_params.items():
+        setattr(agent, name, value)
+    agent.q_table = q_table.copy()
+    visits = np.zeros(q_table.shape, dtype=np.int64)
+    rewards = train_agent(agent, env, n_episodes, seed=seed, visits=visits)
+    return agent.q_table, visits, rewards
+
+
+class RLTrainingRunner:
+    def __init__(self, env_kwargs, n_products, n_states=10, n_actions=10, n_workers=None,
+                 episodes_per_round=5, checkpoint_dir='models/rl', agent_params=None, keep_checkpoints=3):
+        self.env_kwargs = {**env_kwargs, 'n_states': n_states, 'n_actions': n_actions}
+        self.agent = InventoryRLAgent(n_products, n_states, n_actions)
+        self.agent_params = agent_params or {}
+        for name, value in self.agent_params.items():
+            setattr(self.agent, name, value)
+        max_stock = env_kwargs.get('max_stock')
+        if max_stock is None:
+            max_stock = stock_scale(env_kwargs['demand'], env_kwargs['lead_times'])
+        self.agent.set_scale(env_kwargs['product_ids'], max_stock)
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.episodes_per_round = episodes_per_round
+        self.checkpoint_dir = checkpoint_dir
+        self.keep_checkpoints = keep_checkpoints
+        self.visits = np.zeros(self.agent.q_table.shape, dtype=np.int64)
+        self.rounds_completed = 0
+        self.history = []
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    @classmethod
+    def from_inventory(cls, inventory_system, n_replicas=10, episode_length=90, **kwargs):
+        policy = inventory_system.optimize_all_stock_levels()
+        product_ids, demand = inventory_system.store.demand_matrix()
+        env_kwargs = {
+            'demand': demand,
+            'product_ids': product_ids,
+            'lead_times': policy.loc[product_ids, 'lead_time'].to_numpy(),
+            'unit_costs': policy.loc[product_ids, 'unit_cost'].to_numpy(),
+            'n_replicas': n_replicas,
+            'episode_length': episode_length
+        }
+        return cls(env_kwargs, int(product_ids.max()), **kwargs)
+
+    def merge(self, q_tables, visit_counts):
+        # Visit-weighted average: cells a worker never touched don't drag the
+        # merged value back towards its stale copy.
+        visits = np.sum(visit_counts, axis=0)
+        weighted = np.sum([q * v for q, v in zip(q_tables, visit_counts)], axis=0)
+        merged = np.where(visits > 0, weighted / np.maximum(visits, 1), self.agent.q_table)
+        self.agent.q_table = merged
+        self.visits += visits
+        return merged
+
+    def train(self, n_rounds, base_seed=0, checkpoint_every=1):
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.n_workers, mp_context=context) as executor:
+            for _ in range(n_rounds):
+                round_index = self.rounds_completed
+                seeds = [base_seed + round_index * self.n_workers + i for i in range(self.n_workers)]
+                futures = [
+                    executor.submit(
+                        run_training_worker, self.env_kwargs, self.agent.q_table,
+                        self.agent_params, self.episodes_per_round, seed
+                    )
+                    for seed in seeds
+                ]
+                results = [future.result() for future in futures]
+                self.merge([r[0] for r in results], [r[1] for r in results])
+
+                mean_reward = float(np.mean([np.mean(r[2]) for r in results]))
+                self.history.append(mean_reward)
+                self.rounds_completed += 1
+                print(f"RL training round {self.rounds_completed}: mean episode reward {mean_reward:.3f}")
+
+                if self.rounds_completed % checkpoint_every == 0:
+                    self.save_checkpoint()
+        return self.history
+
+    def save_checkpoint(self):
+        path = os.path.join(self.checkpoint_dir, f"q_table_{self.rounds_completed:05d}.npy")
+        np.save(path, self.agent.q_table.astype(np.float32))
+        np.save(os.path.join(self.checkpoint_dir, "visits.npy"), self.visits.astype(np.int32))
+
+        checkpoints = sorted(glob.glob(os.path.join(self.checkpoint_dir, "q_table_*.npy")))
+        for stale in checkpoints[:-self.keep_checkpoints]:
+            os.remove(stale)
+        return path
+
+    def load_checkpoint(self, path=None):
+        if path is None:
+            checkpoints = sorted(glob.glob(os.path.join(self.checkpoint_dir, "q_table_*.npy")))
+            if not checkpoints:
+                return None
+            path = checkpoints[-1]
+        self.agent.q_table = np.load(path).astype(np.float64)
+        self.rounds_completed = int(os.path.basename(path)[len("q_table_"):-len(".npy")])
+        visits_path = os.path.join(self.checkpoint_dir, "visits.npy")
+        if os.path.exists(visits_path):
+            self.visits = np.load(visits_path).astype(np.int64)
+        return path
+
+    def export_policy(self, path=None):
+        path = path or os.path.join(self.checkpoint_dir, "policy.npz")
+        return self.agent.export_policy(path, visits=self.visits)
@@ -1,7 +1,6 @@
 import requests
 from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
-import folium
 import heapq
 from datetime import datetime
 import time
@@ -264,7 +263,8 @@ class RouteOptimizer:
                 return 100.0  
         
     def visualize_route(self, route, route_details=None):
-      
+        import folium
+
         try:
             m = folium.Map(location=self.hospital_location, zoom_start=8)
             folium.Marker(
@@ -353,11 +353,12 @@ class RouteOptimizer:
             print(f"Waiting {interval_minutes} minutes for next optimization...")
             time.sleep(interval_minutes * 60)
 
-optimizer = RouteOptimizer(
-    "Medical College, Trivandrum, Kerala, India",
-    "9d93cff80115b3152f8732f2679b738c",
-    "4fkroF84IrwfpSZOmpatPDHUbr1GNih8"
-)
-best_route, best_cost, best_route_details = optimizer.optimize_route()
-print(f"Best route cost: {best_cost:.2f}")
-optimizer.visualize_route(best_route)
+if __name__ == '__main__':
+    optimizer = RouteOptimizer(
+        "Medical College, Trivandrum, Kerala, India",
+        "9d93cff80115b3152f8732f2679b738c",
+        "4fkroF84IrwfpSZOmpatPDHUbr1GNih8"
+    )
+    best_route, best_cost, best_route_details = optimizer.optimize_route()
+    print(f"Best route cost: {best_cost:.2f}")
+    optimizer.visualize_route(best_route)
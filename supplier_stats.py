@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+STAT_QUANTILES = (0.5, 0.9, 0.95)
+STAT_COLUMNS = [
+    'n_orders', 'lead_time_mean', 'lead_time_std', 'lateness_rate',
+    'schedule_slippage', 'late_delivery_risk'
+] + [f"lead_time_p{int(q * 100)}" for q in STAT_QUANTILES]
+
+
+def order_features(orders):
+    lead_time = orders['Days_for_shipping_real'].to_numpy(dtype=np.float64)
+    scheduled = orders['Days_for_shipment_scheduled'].to_numpy(dtype=np.float64)
+    if 'Late_delivery_risk' in orders.columns:
+        late_risk = orders['Late_delivery_risk'].to_numpy(dtype=np.float64)
+    else:
+        late_risk = np.zeros(len(orders))
+    return pd.DataFrame({
+        'supplier_id': orders['supplier_id'].to_numpy(),
+        'lead_time': lead_time,
+        'late': lead_time > scheduled,
+        'slippage': lead_time - scheduled,
+        'late_risk': late_risk
+    })
+
+
+def aggregate_orders(features):
+    aggregates = features.groupby('supplier_id').agg(
+        n_orders=('lead_time', 'size'),
+        lead_time_mean=('lead_time', 'mean'),
+        lead_time_var=('lead_time', 'var'),
+        late_orders=('late', 'sum'),
+        slippage_sum=('slippage', 'sum'),
+        late_risk_sum=('late_risk', 'sum')
+    )
+    aggregates['lead_time_m2'] = aggregates.pop('lead_time_var').fillna(0) * (aggregates['n_orders'] - 1)
+    return aggregates.astype(np.float64)
+
+
+class SupplierStats:
+    # Per-supplier order statistics kept as mergeable sums (count, mean, M2,
+    # totals and a lead-time histogram in whole days), so appending orders
+    # only touches the suppliers that appear in them.
+    def __init__(self, orders, quantiles=STAT_QUANTILES):
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        self.build(orders)
+
+    def build(self, orders):
+        features = order_features(orders)
+        self.state = aggregate_orders(features)
+        self.histograms = {}
+        self.add_histograms(features)
+        self.table = self.derive(self.state.index)
+
+    def add_histograms(self, features):
+        days = np.clip(np.rint(features['lead_time'].to_numpy()), 0, None).astype(np.int64)
+        for supplier_id, supplier_days in pd.Series(days).groupby(features['supplier_id'].to_numpy()):
+            counts = np.bincount(supplier_days.to_numpy())
+            previous = self.histograms.get(supplier_id)
+            if previous is not None:
+                size = max(len(previous), len(counts))
+                counts = np.pad(counts, (0, size - len(counts))) + np.pad(previous, (0, size - len(previous)))
+            self.histograms[supplier_id] = counts
+
+    def histogram_quantiles(self, supplier_id):
+        cumulative = np.cumsum(self.histograms[supplier_id])
+        return np.searchsorted(cumulative, self.quantiles * cumulative[-1], side='left').astype(np.float64)
+
+    def derive(self, supplier_ids):
+        state = self.state.loc[supplier_ids]
+        n_orders = state['n_orders']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            lead_time_std = np.sqrt(np.where(n_orders > 1, state['lead_time_m2'] / (n_orders - 1), np.nan))
+        table = pd.DataFrame({
+            'n_orders': n_orders.astype(np.int64),
+            'lead_time_mean': state['lead_time_mean'],
+            'lead_time_std': lead_time_std,
+            'lateness_rate': state['late_orders'] / n_orders,
+            'schedule_slippage': state['slippage_sum'] / n_orders,
+            'late_delivery_risk': state['late_risk_sum'] / n_orders
+        }, index=state.index)
+        quantiles = np.array([self.histogram_quantiles(supplier_id) for supplier_id in state.index]).reshape(-1, len(self.quantiles))
+        for i, q in enumerate(self.quantiles):
+            table[f"lead_time_p{int(q * 100)}"] = quantiles[:, i]
+        return table
+
+    def append(self, orders):
+        if len(orders) == 0:
+            return np.array([], dtype=np.int64)
+        features = order_features(orders)
+        batch = aggregate_orders(features)
+        touched = batch.index
+
+        # Chan et al. merge of (count, mean, M2); new suppliers start from zero.
+        current = self.state.reindex(touched).fillna(0.0)
+        n_a = current['n_orders']
+        n_b = batch['n_orders']
+        total = n_a + n_b
+        delta = batch['lead_time_mean'] - current['lead_time_mean']
+        merged = pd.DataFrame({
+            'n_orders': total,
+            'lead_time_mean': current['lead_time_mean'] + delta * n_b / total,
+            'late_orders': current['late_orders'] + batch['late_orders'],
+            'slippage_sum': current['slippage_sum'] + batch['slippage_sum'],
+            'late_risk_sum': current['late_risk_sum'] + batch['late_risk_sum'],
+            'lead_time_m2': current['lead_time_m2'] + batch['lead_time_m2'] + delta ** 2 * n_a * n_b / total
+        }, index=touched)[self.state.columns]
+
+        new_suppliers = not touched.isin(self.state.index).all()
+        if new_suppliers:
+            self.state = self.state.reindex(self.state.index.union(touched))
+        self.state.loc[touched] = merged
+        self.add_histograms(features)
+
+        updated = self.derive(touched)
+        if new_suppliers:
+            self.table = self.table.reindex(self.state.index)
+        self.table.loc[touched] = updated
+        if new_suppliers:
+            self.table['n_orders'] = self.table['n_orders'].astype(np.int64)
+        return touched.to_numpy()
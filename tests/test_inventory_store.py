@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inventory_store import InventoryStore
+
+
+def make_inventory(n_products=200, n_days=100, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'date': np.tile(pd.date_range('2024-01-01', periods=n_days).values, n_products),
+        'product_id': np.repeat(np.arange(1, n_products + 1, dtype=np.int32), n_days),
+        'demand': rng.uniform(0, 100, n_products * n_days).astype(np.float32),
+        'stock_level': rng.uniform(100, 500, n_products * n_days).astype(np.float32),
+        'batch_number': pd.array(['B1'] * (n_products * n_days), dtype='string')
+    })
+
+
+def next_row(store, product_id):
+    row = store.latest_rows([product_id]).copy()
+    row['date'] = row['date'] + pd.Timedelta(days=1)
+    return row
+
+
+def test_append_cost_does_not_scale_with_store_size(monkeypatch):
+    data = make_inventory()
+    store = InventoryStore(data, compact_ratio=10, max_pending=1000)
+    store.drop_duplicates(data.iloc[:1])
+
+    # Any sort/unique/membership pass over the stored history shows up as a
+    # call on an array at least as large as the store.
+    largest = []
+    for name in ['unique', 'union1d', 'isin', 'sort', 'argsort']:
+        original = getattr(np, name)
+
+        def spy(values, *args, _original=original, **kwargs):
+            largest.append(np.size(values))
+            return _original(values, *args, **kwargs)
+        monkeypatch.setattr(np, name, spy)
+
+    for i in range(20):
+        rows, counts = store.prepare_rows(next_row(store, i + 1))
+        assert counts['duplicates'] == 0
+        store.append(rows)
+    assert max(largest) < len(data) // 10
+
+    monkeypatch.undo()
+    rows, counts = store.prepare_rows(store.latest_rows([1, 2]))
+    assert counts['duplicates'] == 2 and rows.empty
+
+
+def test_dedupe_index_survives_compaction():
+    data = make_inventory(n_products=20, n_days=30)
+    store = InventoryStore(data, compact_ratio=10, max_pending=4)
+    store.drop_duplicates(data.iloc[:1])
+    appended = []
+    for i in range(10):
+        row = next_row(store, i % 20 + 1)
+        store.append(store.prepare_rows(row)[0])
+        appended.append(row)
+    store.compact()
+    assert not store.pending_keys
+    _, counts = store.prepare_rows(pd.concat(appended + [data.iloc[:5]]))
+    assert counts['duplicates'] == 15
+
+
+@pytest.mark.parametrize('pending', [False, True])
+def test_stock_movement_below_zero_is_rejected(pending):
+    store = InventoryStore(make_inventory(n_products=5, n_days=10), compact_ratio=10)
+    if pending:
+        store.append(next_row(store, 3))
+    before = store.latest(3).copy()
+    length = len(store)
+
+    with pytest.raises(ValueError):
+        store.adjust_stock(3, -(before['stock_level'] + 1))
+    with pytest.raises(ValueError):
+        store.adjust_stock(3, float('nan'))
+    pd.testing.assert_series_equal(store.latest(3), before)
+    assert len(store) == length
+
+    assert store.adjust_stock(3, -before['stock_level']) == 0
+    assert store.latest(3)['stock_level'] == 0
+
+
+def test_stats_match_history():
+    data = make_inventory(n_products=5, n_days=10)
+    store = InventoryStore(data, compact_ratio=10)
+    store.append(next_row(store, 2))
+    demand = store.rows(2)['demand'].astype(np.float64)
+
+    stats = store.stats(2)
+    assert stats['n'] == len(demand) == 11
+    assert stats['demand_mean'] == pytest.approx(demand.mean())
+    assert 'demand_std' not in stats
+    assert store.stats(2, include_std=True)['demand_std'] == pytest.approx(demand.std())
+    assert store.stats(99) is None
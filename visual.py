@@ -1,12 +1,10 @@
 import plotly.graph_objects as go
 import plotly.express as px
-import folium
 import plotly.graph_objects as go
 import plotly.io
 from datetime import datetime, timedelta
 import traceback
 import random
-from branca.element import Figure
 from geopy.distance import geodesic
 import math
 
@@ -150,6 +148,9 @@ def create_forecast_chart(forecast_data, product_id, historical_data=None):
         return plotly.io.to_json(fig)
     
 def create_route_map(route):
+    import folium
+    from branca.element import Figure
+
     try:
         if not route or len(route) < 2:
             default_center = [10.8505, 76.2711] 